@@ -0,0 +1,100 @@
+import logging
+import threading
+from core.tlv_app import TLVApp
+
+
+class TLVAppPool:
+    """TLV应用实例池：跨用例复用已启动并插入控件的应用实例"""
+
+    def __init__(self, control_name="TLV Control", max_size=1, app_factory=TLVApp):
+        """
+        :param control_name: 每个实例需要插入的控件名称
+        :param max_size: 池中保留的空闲实例上限
+        :param app_factory: 创建应用实例的工厂（默认TLVApp）
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.control_name = control_name
+        self.max_size = max_size
+        self.app_factory = app_factory
+        self._idle = []
+        self._lock = threading.Lock()
+        self.stats = {"launched": 0, "reused": 0, "reset_failed": 0}
+
+    def acquire(self) -> TLVApp:
+        """取出一个健康且已重置的实例，池为空或重置失败时全新启动"""
+        while True:
+            with self._lock:
+                app = self._idle.pop() if self._idle else None
+            if app is None:
+                return self._launch()
+
+            if not app.is_healthy():
+                self.logger.warning("池中实例健康检查失败，丢弃")
+                self._dispose(app)
+                continue
+
+            try:
+                app.reset()
+            except Exception as e:
+                self.logger.warning(f"实例重置失败，改为全新启动: {str(e)}")
+                self.stats["reset_failed"] += 1
+                self._dispose(app)
+                continue
+
+            self.stats["reused"] += 1
+            self.logger.info(f"复用TLV应用实例 (已复用 {self.stats['reused']} 次)")
+            return app
+
+    def release(self, app: TLVApp, discard=False):
+        """归还实例，下次取出时再重置"""
+        if discard:
+            self._dispose(app)
+            return
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append(app)
+                return
+        self._dispose(app)
+
+    def shutdown(self):
+        """关闭池中所有实例"""
+        with self._lock:
+            apps, self._idle = self._idle, []
+        for app in apps:
+            app.shutdown()
+        self.logger.info(f"应用池已关闭，统计: {self.stats}")
+
+    def _launch(self) -> TLVApp:
+        self.logger.info("启动新的TLV应用实例")
+        app = self.app_factory()
+        try:
+            app.insert_control(self.control_name)
+        except Exception:
+            app.kill()
+            raise
+        self.stats["launched"] += 1
+        return app
+
+    def _dispose(self, app: TLVApp):
+        try:
+            app.shutdown()
+        except Exception as e:
+            self.logger.error(f"释放实例失败: {str(e)}")
+
+
+_shared_pool = None
+
+
+def get_shared_pool(**kwargs) -> TLVAppPool:
+    """获取进程级共享池，供worker在多次pytest会话间保持应用实例"""
+    global _shared_pool
+    if _shared_pool is None:
+        _shared_pool = TLVAppPool(**kwargs)
+    return _shared_pool
+
+
+def shutdown_shared_pool():
+    global _shared_pool
+    if _shared_pool is not None:
+        _shared_pool.shutdown()
+        _shared_pool = None
@@ -0,0 +1,104 @@
+import logging
+import threading
+from core.wait_strategy import SmartWait, probe_ready, resolve_control
+
+
+class RegistryStats:
+    """控件缓存命中统计"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def record(self, kind):
+        with self._lock:
+            setattr(self, kind, getattr(self, kind) + 1)
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return f"命中 {self.hits} 次, 未命中 {self.misses} 次, 失效重解析 {self.stale} 次, 命中率 {rate:.1f}%"
+
+
+_global_stats = RegistryStats()
+
+
+def get_registry_stats() -> RegistryStats:
+    """所有页面控件缓存的汇总统计"""
+    return _global_stats
+
+
+def _is_alive(wrapper) -> bool:
+    """读取一次实时属性判断元素是否仍然有效（不搜索控件树）"""
+    try:
+        wrapper.element_info.rectangle
+        return True
+    except Exception:
+        return False
+
+
+class ControlRegistry:
+    """已解析控件缓存：控件规格只在首次使用或元素失效时搜索控件树"""
+
+    def __init__(self, wait: SmartWait):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.wait = wait
+        self.stats = RegistryStats()
+        self._specs = {}
+        self._wrappers = {}
+
+    def register(self, name, spec):
+        """登记控件规格，返回规格本身以便页面对象保留属性引用"""
+        self._specs[name] = spec
+        self._wrappers.pop(name, None)
+        return spec
+
+    def get(self, name, ready=True):
+        """
+        返回控件包装对象
+        :param ready: True时要求控件可见且可用，否则只要求元素有效
+        """
+        wrapper = self._wrappers.get(name)
+        if wrapper is not None:
+            if probe_ready(wrapper) if ready else _is_alive(wrapper):
+                self._record("hits")
+                return wrapper
+            self.logger.debug(f"控件 {name} 缓存失效，重新解析")
+            self._record("stale")
+            del self._wrappers[name]
+
+        self._record("misses")
+        spec = self._specs[name]
+        if not ready:
+            wrapper = self._wrappers[name] = spec.wrapper_object()
+            return wrapper
+
+        resolved = []
+
+        def probe(control):
+            # 保留就绪探测时解析到的包装对象，避免再搜索一次控件树
+            try:
+                wrapper = resolve_control(control)
+            except Exception:
+                return False
+            if probe_ready(wrapper):
+                resolved.append(wrapper)
+                return True
+            return False
+
+        self.wait.until_element_ready(spec, probe=probe)
+        wrapper = self._wrappers[name] = resolved[-1]
+        return wrapper
+
+    def invalidate(self, name=None):
+        """清除指定控件（默认全部）的缓存"""
+        if name is None:
+            self._wrappers.clear()
+        else:
+            self._wrappers.pop(name, None)
+
+    def _record(self, kind):
+        self.stats.record(kind)
+        _global_stats.record(kind)
@@ -1,27 +1,118 @@
+import logging
+import math
 import time
+from pywinauto.findwindows import ElementNotFoundError
+
+logger = logging.getLogger("core.find_item")
+
+
+class ListItemNotFoundError(ElementNotFoundError):
+    """列表中不存在目标项"""
+
+
+def _sort_key(title):
+    return (title or "").casefold()
+
+
+def _read_items(parent):
+    """一次查询读取当前已实现的全部列表项: [(标题, 包装对象, 是否在可视区)]"""
+    items = []
+    for wrapper in parent.children(control_type="ListItem"):
+        info = wrapper.element_info
+        items.append((info.name, wrapper, info.visible))
+    return items
+
+
+def _plan_paging(items, title):
+    """
+    根据目标与可视区的相对位置决定翻页方向和页数
+    :return: (方向, 页数)，方向为 "up"/"down"，无法确定位置时返回 (None, 0)
+    """
+    visible_idx = [i for i, item in enumerate(items) if item[2]] or list(range(len(items)))
+    if not visible_idx:
+        return "down", 1
+    first, last = visible_idx[0], visible_idx[-1]
+    page_size = len(visible_idx)
+
+    titles = [item[0] for item in items]
+    if title in titles:
+        # 目标已在列表中但不在可视区，按索引距离计算页数
+        target = titles.index(title)
+        if target < first:
+            return "up", math.ceil((first - target) / page_size)
+        if target > last:
+            return "down", math.ceil((target - last) / page_size)
+        # 处于可视区间内却不可见（如只露出一部分），向较近的一侧翻一页
+        return ("up" if target - first < last - target else "down"), 1
+
+    keys = [_sort_key(items[i][0]) for i in visible_idx]
+    if keys != sorted(keys):
+        # 列表未排序，只能顺序向下翻页
+        return "down", 1
+    target_key = _sort_key(title)
+    if target_key < keys[0]:
+        return "up", 1
+    if target_key > keys[-1]:
+        return "down", 1
+    # 目标应处于可视区间内却不存在
+    return None, 0
+
+
+def _scroll_into_view(wrapper) -> bool:
+    """通过UIA ScrollItem模式把列表项滚动到可视区，不支持时返回False"""
+    try:
+        wrapper.iface_scroll_item.ScrollIntoView()
+        return True
+    except Exception:
+        return False
 
 
 def find_list_item(parent, title, attempts=20):
     """
-    滚动查找函数
+    批量扫描查找列表项：一次读取可视区全部标题，按排序位置决定翻页方向与页数
+    :raises ListItemNotFoundError: 目标不存在或已翻到列表尽头
     """
-    current_attempt = 0
-    item = None
-    down_btn = parent.child_window(title="向下翻页", auto_id="DownPageButton", control_type="Button")
+    buttons = {
+        "down": parent.child_window(title="向下翻页", auto_id="DownPageButton", control_type="Button"),
+        "up": parent.child_window(title="向上翻页", auto_id="UpPageButton", control_type="Button"),
+    }
+    last_signature = None
+    scrolled = False
     for _ in range(attempts):
+        items = _read_items(parent)
+        hidden = None
+        for item_title, wrapper, visible in items:
+            if item_title == title:
+                if visible:
+                    return wrapper
+                hidden = wrapper
+
+        if hidden is not None and not scrolled:
+            # 目标已在列表中但不可见，先尝试直接滚动到该项（只尝试一次，失败时按翻页处理）
+            scrolled = True
+            if _scroll_into_view(hidden):
+                time.sleep(0.05)
+                continue
+
+        signature = tuple(item[0] for item in items if item[2])
+        if signature == last_signature:
+            reason = "已到达列表尽头"
+            break
+        last_signature = signature
+
+        direction, pages = _plan_paging(items, title)
+        if direction is None:
+            reason = "按排序位置应在可视区内但不存在"
+            break
         try:
-            item = parent.child_window(
-                title=title,
-                control_type="ListItem"
-            ).wait("exists ready", timeout=0.2)
+            for _ in range(pages):
+                buttons[direction].click_input()
+        except ElementNotFoundError:
+            reason = "列表无可用翻页按钮"
             break
-        except Exception:
-            down_btn.click_input()
-            time.sleep(0.1)
-        current_attempt += 1
-    if item:
-        # item.click_input()
-        # print("找到目标项！")  # 保持原有输出
-        return item
+        time.sleep(0.05)
     else:
-        print("未找到目标项")  # 保持原有输出
+        reason = f"超过最大翻页次数 {attempts}"
+
+    logger.warning(f"未找到列表项 {title}: {reason}")
+    raise ListItemNotFoundError(f"列表项 {title} 未找到: {reason}")
@@ -0,0 +1,82 @@
+import json
+import logging
+import re
+from pathlib import Path
+from typing import List, Optional
+
+
+def file_version(*paths) -> str:
+    """以文件名、大小和修改时间组合出版本标识"""
+    parts = []
+    for path in paths:
+        path = Path(path)
+        stat = path.stat()
+        parts.append(f"{path.name}:{stat.st_size}:{int(stat.st_mtime)}")
+    return "|".join(parts)
+
+
+class MethodCatalog:
+    """控件方法目录：缓存方法名在"Method Name:"下拉列表中的顺序，按控件和版本持久化"""
+
+    def __init__(self, control_name: str, version: str, cache_dir=".cache/method_catalog"):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.control_name = control_name
+        self.version = version
+        safe_name = re.sub(r'[^\w.-]+', '_', control_name)
+        self.path = Path(cache_dir) / f"{safe_name}.json"
+        self.methods: List[str] = []
+        self._index = {}
+        self._loaded = False
+
+    def index_of(self, method_name: str) -> Optional[int]:
+        """返回方法在列表中的位置，目录为空或不存在该方法时返回None"""
+        if not self._loaded:
+            self.load()
+        return self._index.get(method_name)
+
+    def load(self) -> bool:
+        """从磁盘加载目录，版本不一致视为过期"""
+        self._loaded = True
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get('control') != self.control_name or data.get('version') != self.version:
+            self.logger.info(f"控件 {self.control_name} 方法目录版本已变化，等待重建")
+            return False
+        self._set_methods(data.get('methods', []))
+        self.logger.debug(f"已加载方法目录: {len(self.methods)} 个方法")
+        return True
+
+    def rebuild(self, methods: List[str]):
+        """
+        按下拉框的完整项目列表重建目录，列表与已有目录相同时不写磁盘
+        :param methods: 下拉框自身的全部项目（顺序与ComboBox.select(index)的位置一致）
+        """
+        if not self._loaded:
+            self.load()
+        if list(methods) == self.methods:
+            return
+        self._set_methods(methods)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'control': self.control_name,
+                    'version': self.version,
+                    'methods': self.methods,
+                }, f, ensure_ascii=False, indent=2)
+            self.logger.info(f"方法目录已重建: {len(self.methods)} 个方法")
+        except OSError as e:
+            self.logger.error(f"保存方法目录失败: {str(e)}")
+
+    def invalidate(self):
+        """目录与界面不一致时清空，下次查找时重建"""
+        self._set_methods([])
+        self._loaded = True
+        self.path.unlink(missing_ok=True)
+
+    def _set_methods(self, methods):
+        self.methods = list(methods)
+        self._index = {name: i for i, name in enumerate(self.methods)}
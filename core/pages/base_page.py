@@ -1,19 +1,22 @@
 import logging
 from pywinauto import timings
-from core.wait_strategy import SmartWait
+from core.control_registry import ControlRegistry
+from core.wait_strategy import SmartWait, create_wait
 
 
 class BasePage:
     """页面对象基类"""
 
-    def __init__(self, app_window):
+    def __init__(self, app_window, wait: SmartWait = None):
         self.window = app_window
 
         logger_name = f"{self.__class__.__name__}"
         self.logger = logging.getLogger(logger_name)
         self.logger.debug(f"初始化页面对象: {logger_name}")
 
-        self.wait = SmartWait(base_timeout=10)
+        # 子窗口页面沿用主窗口的等待引擎，共享其事件订阅
+        self.wait = wait or create_wait(app_window, base_timeout=10)
+        self.controls = ControlRegistry(self.wait)
         self._init_controls()
         self.logger.debug(f"页面对象: {logger_name}初始化成功")
 
@@ -21,6 +24,14 @@ class BasePage:
         """控件初始化(子类实现)"""
         raise NotImplementedError("子类必须实现控件初始化")
 
+    def register(self, name, spec):
+        """登记需要缓存的控件规格"""
+        return self.controls.register(name, spec)
+
+    def control(self, name, ready=True):
+        """获取已缓存的控件包装对象，失效时自动重新解析"""
+        return self.controls.get(name, ready=ready)
+
     def get_state(self) -> bool:
         """增强窗口状态检测"""
         try:
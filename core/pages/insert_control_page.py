@@ -6,8 +6,8 @@ class InsertControlPage(BasePage):
     """插入控件窗口页面对象"""
     def _init_controls(self):
         # 控件定位
-        self.control_list = self.window.child_window(auto_id="1053", control_type="List")
-        self.ok_btn = self.window.child_window(title="OK", auto_id="1", control_type="Button")
+        self.control_list = self.register("control_list", self.window.child_window(auto_id="1053", control_type="List"))
+        self.ok_btn = self.register("ok_btn", self.window.child_window(title="OK", auto_id="1", control_type="Button"))
 
     def select_control(self, control_name: str):
         """选择指定控件"""
@@ -20,7 +20,7 @@ class InsertControlPage(BasePage):
 
     def confirm_selection(self):
         """确认选择"""
-        self.wait.until_element_ready(self.ok_btn)
+        ok_btn = self.control("ok_btn")
         self.logger.info(f"关闭插入控件的窗口")
-        self.ok_btn.click()
+        ok_btn.click()
 
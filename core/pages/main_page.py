@@ -6,8 +6,9 @@ class MainPage(BasePage):
     """主界面页面对象"""
     def _init_controls(self):
         # 菜单项定位
-        self.max_btn = self.window.child_window(title="最大化", control_type="Button")
-        self.close_btn = self.window.child_window(title="关闭", control_type="Button")
+        self.max_btn = self.register("max_btn", self.window.child_window(title="最大化", control_type="Button"))
+        self.close_btn = self.register("close_btn", self.window.child_window(title="关闭", control_type="Button"))
+        self.method_catalog = None  # 插入控件后由TLVApp设置
 
     def open_insert_control(self) -> 'InsertControlPage':  # 使用字符串类型提示
         """打开插入控件窗口"""
@@ -17,7 +18,7 @@ class MainPage(BasePage):
         insert_dlg = self.window.child_window(title="Insert Control", control_type="Window")
         self.wait.until_element_ready(insert_dlg)
         self.logger.info("插入控件窗口打开成功")
-        return InsertControlPage(insert_dlg)
+        return InsertControlPage(insert_dlg, wait=self.wait)
 
     def open_method_window(self) -> 'MethodWindowPage':
         """打开方法调用窗口"""
@@ -27,15 +28,14 @@ class MainPage(BasePage):
         method_wnd = self.window.child_window(title="Invoke Methods", control_type="Window")
         self.wait.until_element_ready(method_wnd)
         self.logger.info("方法调用窗口打开成功")
-        return MethodWindowPage(method_wnd)
+        return MethodWindowPage(method_wnd, wait=self.wait, catalog=self.method_catalog)
 
     def set_window(self):
         self.maximize_window()
         self.adjust_layout()
 
     def maximize_window(self):
-        self.wait.until_element_ready(self.max_btn)  # 新增等待
-        self.max_btn.click()
+        self.control("max_btn").click()
 
     def adjust_layout(self):
         """调整控件布局"""
@@ -48,6 +48,6 @@ class MainPage(BasePage):
         self.logger.info("控件布局调整完成")
 
     def close(self):
-        self.wait.until_element_ready(self.close_btn)
+        close_btn = self.control("close_btn")
         self.logger.info("关闭主页面")
-        self.close_btn.click()
+        close_btn.click()
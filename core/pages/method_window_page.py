@@ -1,18 +1,30 @@
 from pywinauto import ElementNotFoundError
 from core.find_item import find_list_item
+from core.method_catalog import MethodCatalog
 from core.pages.base_page import BasePage
+from core.param_input import ParameterInput
 from utils.retry import retry
 
 
 class MethodWindowPage(BasePage):
     """方法调用窗口页面对象"""
+    def __init__(self, app_window, wait=None, catalog: MethodCatalog = None):
+        self.catalog = catalog
+        super().__init__(app_window, wait=wait)
+
     def _init_controls(self):
         # 核心控件定位
-        self.method_combo = self.window.child_window(title="Method Name:", auto_id="1008", control_type="ComboBox")
-        self.invoke_btn = self.window.child_window(title="Invoke", auto_id="1015", control_type="Button")
-        self.return_value = self.window.child_window(title="Return Value:", auto_id="1016", control_type="Edit")
-        self.close_btn = self.window.child_window(title="Close", auto_id="1", control_type="Button")
+        self.method_combo = self.register(
+            "method_combo", self.window.child_window(title="Method Name:", auto_id="1008", control_type="ComboBox"))
+        self.invoke_btn = self.register(
+            "invoke_btn", self.window.child_window(title="Invoke", auto_id="1015", control_type="Button"))
+        self.return_value = self.register(
+            "return_value", self.window.child_window(title="Return Value:", auto_id="1016", control_type="Edit"))
+        self.close_btn = self.register(
+            "close_btn", self.window.child_window(title="Close", auto_id="1", control_type="Button"))
+        # 下拉列表每次展开都会重建，不做缓存
         self.list_box = self.window.app.window(title="Method Name:", control_type="List")
+        self.param_input = ParameterInput(self.window, self.controls)
 
     def invoke_method(self, method_name, parameters):
         """执行完整方法调用流程"""
@@ -26,44 +38,71 @@ class MethodWindowPage(BasePage):
     @retry(max_attempts=5, exceptions=ElementNotFoundError)
     def select_method(self, method_name: str):
         """选择方法"""
-        self.wait.until_element_ready(self.method_combo)
+        combo = self.control("method_combo")
         self.logger.info(f"查找并选择方法 {method_name}")
-        self.method_combo.expand()
+        if self.catalog is not None:
+            if self._select_from_catalog(combo, method_name):
+                self.logger.info(f"方法 {method_name}已按目录直接选择")
+                return self
+            if self._rebuild_catalog(combo) and self._select_from_catalog(combo, method_name):
+                self.logger.info(f"方法 {method_name}已按重建的目录选择")
+                return self
+        combo.expand()
         self.wait.until_element_ready(self.list_box)
         item = find_list_item(self.list_box, method_name)
         item.click_input()
         self.logger.info(f"方法 {method_name}已找到并选择")
         return self
 
+    def _select_from_catalog(self, combo, method_name: str) -> bool:
+        """按目录中的位置直接选择方法，选择结果与目录不符时判定目录过期"""
+        index = self.catalog.index_of(method_name)
+        if index is None:
+            return False
+        try:
+            combo.select(index)
+            if combo.selected_text() == method_name:
+                return True
+        except (IndexError, ElementNotFoundError) as e:
+            self.logger.debug(f"按目录选择方法失败: {str(e)}")
+        self.logger.warning(f"方法目录已过期（位置 {index} 不是 {method_name}），重建目录")
+        self.catalog.invalidate()
+        return False
+
+    def _rebuild_catalog(self, combo) -> bool:
+        """
+        按下拉框自身的项目列表重建目录
+        （展开后的列表只实现可视区附近的项，其子项序号不是下拉框中的位置）
+        """
+        try:
+            methods = combo.texts()
+        except Exception as e:
+            self.logger.debug(f"读取方法列表失败: {str(e)}")
+            return False
+        self.catalog.rebuild(methods)
+        return True
+
     def set_parameters(self, parameters):
         """输入参数"""
         self.logger.info(f"开始输入参数")
         for param in parameters:
-            ctrl = self.window.child_window(
-                title="Parameter Value:",
-                control_type="ComboBox" if isinstance(param, bool) else "Edit"
-            )
-            self.wait.until_element_ready(ctrl)  # 新增等待
             self.logger.debug(f"输入参数: {str(param)}")
-            ctrl.type_keys(str(param))
-            self.window.child_window(title="Set Value", auto_id="1013", control_type="Button").click()
+            self.param_input.set(param)
         self.logger.info(f"参数输入完毕")
         return self
 
     def execute_invoke(self):
         """执行调用"""
         self.logger.info(f"执行调用")
-        self.wait.until_element_ready(self.invoke_btn)
-        self.invoke_btn.click()
+        self.control("invoke_btn").click()
         return self  # 保持当前页面上下文
 
     def get_property(self, prop):
         if prop == "return_value":
-            return self.return_value.get_value()
+            return self.control("return_value", ready=False).get_value()
 
     def close_method(self):
         self.logger.info(f"关闭方法窗口")
-        self.wait.until_element_ready(self.close_btn)
-        self.close_btn.click()
+        self.control("close_btn").click()
 
 
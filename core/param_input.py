@@ -0,0 +1,78 @@
+import logging
+import re
+from core.control_registry import ControlRegistry
+
+# type_keys中有特殊含义的字符
+_SEND_KEYS_SPECIAL = re.compile(r'([{}+^%~()\[\]])')
+
+
+def escape_keys(text: str) -> str:
+    """转义type_keys的特殊字符，使其按字面输入"""
+    return _SEND_KEYS_SPECIAL.sub(r'{\1}', text)
+
+
+class ParameterInput:
+    """
+    方法参数输入层：每个方法窗口只解析一次参数控件
+    文本参数优先通过Value模式直接设值，其次剪贴板粘贴，最后才逐键输入；
+    布尔参数直接在下拉框中选择
+    """
+
+    def __init__(self, window, controls: ControlRegistry):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.controls = controls
+        controls.register("param_edit", window.child_window(title="Parameter Value:", control_type="Edit"))
+        controls.register("param_combo", window.child_window(title="Parameter Value:", control_type="ComboBox"))
+        controls.register("set_value_btn", window.child_window(title="Set Value", auto_id="1013", control_type="Button"))
+
+    def set(self, param):
+        """输入单个参数并点击"Set Value"提交"""
+        if isinstance(param, bool):
+            self._set_choice(str(param))
+        else:
+            self._set_text(str(param))
+        self.controls.get("set_value_btn").click()
+
+    def _set_text(self, text: str):
+        edit = self.controls.get("param_edit")
+        for setter in (self._set_by_value, self._set_by_paste, self._set_by_keys):
+            try:
+                setter(edit, text)
+            except Exception as e:
+                self.logger.debug(f"{setter.__name__} 输入失败: {str(e)}")
+                continue
+            if edit.get_value() == text:
+                self.logger.debug(f"参数已通过 {setter.__name__} 输入: {text}")
+                return
+        raise ValueError(f"参数输入校验失败: 期望 {text}, 实际 {edit.get_value()}")
+
+    def _set_choice(self, text: str):
+        combo = self.controls.get("param_combo")
+        try:
+            combo.select(text)
+        except (IndexError, ValueError) as e:
+            self.logger.debug(f"下拉框直接选择失败，改为逐键输入: {str(e)}")
+            combo.type_keys(escape_keys(text))
+        selected = combo.selected_text() or ""
+        if text.lower() not in selected.lower():
+            raise ValueError(f"参数选择校验失败: 期望 {text}, 实际 {selected}")
+
+    @staticmethod
+    def _set_by_value(edit, text):
+        edit.set_edit_text(text)
+
+    @staticmethod
+    def _set_by_paste(edit, text):
+        import win32clipboard
+
+        win32clipboard.OpenClipboard()
+        try:
+            win32clipboard.EmptyClipboard()
+            win32clipboard.SetClipboardText(text, win32clipboard.CF_UNICODETEXT)
+        finally:
+            win32clipboard.CloseClipboard()
+        edit.type_keys("^a^v")
+
+    @staticmethod
+    def _set_by_keys(edit, text):
+        edit.type_keys("^a{BACKSPACE}" + escape_keys(text), with_spaces=True)
@@ -2,6 +2,7 @@ import logging
 import platform
 from pathlib import Path
 from pywinauto import Application
+from core.method_catalog import MethodCatalog, file_version
 from core.pages.main_page import MainPage
 from utils.data_loader import read_yaml
 
@@ -17,7 +18,12 @@ class TLVApp:
         exe_path = Path(config['paths']['tlv_exe'][system.lower()])
         if not exe_path.exists():
             raise FileNotFoundError(f"TLV可执行文件未找到: {exe_path}")
+        self.paths = config['paths']
+        self.exe_path = exe_path
 
+        self.control_name = None  # 当前已插入的控件名称
+        self.applied_steps = ()  # 插入控件以来执行过的步骤签名（见utils.prefix_planner），重新插入控件时清除
+        self.applied_origins = ()  # 对应步骤实际执行所在的用例ID
         self.app = Application(backend="uia").start(str(exe_path))
         self.main_window = self.app.window(title="Untitled - ActiveX Control Test Container", control_type="Window")
         self.main_page = MainPage(self.main_window)
@@ -26,6 +32,13 @@ class TLVApp:
         """插入控件流程(使用Page Object)"""
         self.logger.info(f"正在进行控件: {control_name} 插入流程")
         self.main_page.open_insert_control().select_control(control_name).confirm_selection()
+        self.control_name = control_name
+        self.applied_steps, self.applied_origins = (), ()
+        self.main_page.method_catalog = MethodCatalog(
+            control_name,
+            self._control_version(),
+            cache_dir=Path(self.paths.get('cache', '.cache')) / "method_catalog"
+        )
         self.logger.info(f"控件 {control_name} 插入流程结束")
         return
 
@@ -35,9 +48,70 @@ class TLVApp:
         self.logger.info(f"方法: {method} 调用成功")
         return
 
+    def _control_version(self) -> str:
+        """控件版本标识：容器可执行文件及（若配置）控件文件的大小与修改时间"""
+        version_files = [self.exe_path]
+        control_path = self.paths.get('tlv_control')
+        if control_path and Path(control_path).exists():
+            version_files.append(control_path)
+        return file_version(*version_files)
+
     def resize_window(self):
         self.main_page.set_window()
 
+    def is_healthy(self) -> bool:
+        """检查进程存活且主窗口可操作"""
+        try:
+            return self.app.is_process_running() and self.main_page.get_state()
+        except Exception as e:
+            self.logger.warning(f"应用健康检查异常: {str(e)}")
+            return False
+
+    def has_control(self) -> bool:
+        """控件插入后"Invoke Methods"菜单才可用，以此判断控件是否仍在容器中"""
+        try:
+            return self.main_window.menu_item("Control->Invoke Methods").is_enabled()
+        except Exception:
+            return False
+
+    def close_dialogs(self):
+        """关闭主窗口下所有残留的对话框（方法窗口、插入控件窗口、消息框等）"""
+        for dialog in self.main_window.children(control_type="Window"):
+            title = dialog.window_text()
+            self.logger.debug(f"关闭残留对话框: {title}")
+            dialog.close()
+
+    def reset(self):
+        """将应用恢复到已知状态，仅在控件丢失时重新插入"""
+        self.logger.info("重置TLV应用状态")
+        self.close_dialogs()
+        if self.control_name and not self.has_control():
+            self.logger.info(f"控件 {self.control_name} 已丢失，重新插入")
+            self.insert_control(self.control_name)
+
     def close(self):
-        self.main_page.close()
+        try:
+            self.main_page.close()
+        finally:
+            self._close_event_source()
+
+    def shutdown(self, timeout=5):
+        """关闭应用并等待进程退出，超时则强制结束"""
+        try:
+            self.close()
+            self.app.wait_for_process_exit(timeout=timeout)
+        except Exception as e:
+            self.logger.warning(f"应用未能正常退出，强制结束进程: {str(e)}")
+            self.kill()
+        self._close_event_source()
+
+    def _close_event_source(self):
+        """取消等待引擎的UIA事件订阅（engine: event时），重复调用无副作用"""
+        if self.main_page.wait.event_source is not None:
+            self.main_page.wait.event_source.close()
 
+    def kill(self):
+        try:
+            self.app.kill()
+        except Exception as e:
+            self.logger.error(f"结束TLV进程失败: {str(e)}")
@@ -1,26 +1,266 @@
+import ctypes
+import logging
+import threading
 import time
-from pywinauto.timings import TimeoutError
+from functools import lru_cache
+from utils.data_loader import read_yaml
+
+try:
+    from pywinauto.timings import TimeoutError
+except ImportError:  # 非Windows环境（如模拟控件调试）回退到内置TimeoutError
+    pass
+
+logger = logging.getLogger("core.wait_strategy")
+
+
+def resolve_control(control):
+    """
+    将控件规格解析为包装对象，只搜索一次控件树、不重试
+    （wrapper_object()在元素不存在时会按Timings.window_find_timeout反复搜索，阻塞外层的轮询等待）
+    按规格的逐级条件用findwindows.find_element查找，与wrapper_object()的解析方式一致
+    已是包装对象时原样返回；解析失败时抛出pywinauto的查找异常
+    """
+    if not hasattr(control, "wrapper_object"):
+        return control
+    from pywinauto import findwindows
+
+    element = None
+    for level, criteria in enumerate(control.criteria):
+        criteria = dict(criteria)
+        if "app" in criteria:  # Application.window()按app限定进程，find_element只接受process
+            criteria["process"] = criteria.pop("app").process
+        if level:
+            criteria["top_level_only"] = False
+            criteria.setdefault("parent", element)
+        element = findwindows.find_element(**criteria)
+    return control.backend.generic_wrapper_class(element)
+
+
+def probe_ready(control) -> bool:
+    """
+    组合就绪探测：只解析一次元素，再在同一个包装对象上检查可见与可用
+    （WindowSpecification每次属性访问都会重新搜索控件树）
+    """
+    try:
+        wrapper = resolve_control(control)
+        return bool(wrapper.is_visible() and wrapper.is_enabled())
+    except Exception:  # 控件不存在、不唯一或已失效
+        return False
+
+
+class WaitStats:
+    """等待耗时统计"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.timeouts = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.last_time = 0.0
+
+    def record(self, duration, ready=True):
+        with self._lock:
+            self.count += 1
+            self.total_time += duration
+            self.max_time = max(self.max_time, duration)
+            self.last_time = duration
+            if not ready:
+                self.timeouts += 1
+
+    def summary(self) -> str:
+        avg = self.total_time / self.count if self.count else 0.0
+        return (f"等待 {self.count} 次, 超时 {self.timeouts} 次, 总耗时 {self.total_time:.3f}s, "
+                f"平均 {avg * 1000:.1f}ms, 最长 {self.max_time * 1000:.1f}ms")
+
+
+_global_stats = WaitStats()
+
+
+def get_wait_stats() -> WaitStats:
+    """所有SmartWait实例共享的汇总统计"""
+    return _global_stats
+
+
+class EventSource:
+    """
+    后端事件源：控件树发生变化时唤醒等待中的SmartWait
+    子类实现_start/_stop完成真正的订阅；模拟环境可直接调用notify()
+    """
+
+    def __init__(self):
+        self._listeners = set()
+        self._lock = threading.Lock()
+        self._started = False
+
+    def add_listener(self, signal: threading.Event):
+        with self._lock:
+            if not self._started:
+                try:
+                    self._start()
+                except Exception as e:
+                    logger.warning(f"事件订阅失败，回退为轮询等待: {str(e)}")
+                self._started = True
+            self._listeners.add(signal)
+
+    def remove_listener(self, signal: threading.Event):
+        with self._lock:
+            self._listeners.discard(signal)
+
+    def notify(self):
+        with self._lock:
+            listeners = list(self._listeners)
+        for signal in listeners:
+            signal.set()
+
+    def close(self):
+        with self._lock:
+            if self._started:
+                self._stop()
+                self._started = False
+            self._listeners.clear()
+
+    def _start(self):
+        pass
+
+    def _stop(self):
+        pass
+
+
+class UIAEventSource(EventSource):
+    """订阅UIA结构变化及可用/可见属性变化事件"""
+
+    def __init__(self, window):
+        super().__init__()
+        self.window = window
+        self._element = None
+        self._handler = None
+
+    def _start(self):
+        import comtypes
+        from pywinauto.uia_defines import IUIA
+
+        uia = IUIA()
+        uia_dll = uia.UIA_dll
+        notify = self.notify
+
+        class _Handler(comtypes.COMObject):
+            _com_interfaces_ = [
+                uia_dll.IUIAutomationStructureChangedEventHandler,
+                uia_dll.IUIAutomationPropertyChangedEventHandler,
+            ]
+
+            def HandleStructureChangedEvent(self, sender, change_type, runtime_id):
+                notify()
+
+            def HandlePropertyChangedEvent(self, sender, property_id, new_value):
+                notify()
+
+        self._element = self.window.wrapper_object().element_info.element
+        self._handler = _Handler()
+        property_ids = (ctypes.c_int * 2)(uia_dll.UIA_IsEnabledPropertyId, uia_dll.UIA_IsOffscreenPropertyId)
+        uia.iuia.AddStructureChangedEventHandler(
+            self._element, uia_dll.TreeScope_Subtree, None, self._handler)
+        uia.iuia.AddPropertyChangedEventHandlerNativeArray(
+            self._element, uia_dll.TreeScope_Subtree, None, self._handler, property_ids, len(property_ids))
+        logger.debug("已订阅UIA控件树事件")
+
+    def _stop(self):
+        from pywinauto.uia_defines import IUIA
+
+        uia = IUIA()
+        try:
+            uia.iuia.RemoveStructureChangedEventHandler(self._element, self._handler)
+            uia.iuia.RemovePropertyChangedEventHandler(self._element, self._handler)
+        except Exception as e:
+            logger.debug(f"取消UIA事件订阅失败: {str(e)}")
+        self._element = None
+        self._handler = None
+
+
+def _wait_signal(signal: threading.Event, timeout) -> bool:
+    return signal.wait(timeout)
 
 
 class SmartWait:
-    """基础智能等待实现"""
+    """智能等待实现：自适应退避轮询，可选事件唤醒"""
 
-    def __init__(self, base_timeout=10.0, base_interval=0.5):
+    def __init__(self, base_timeout=10.0, base_interval=0.25, initial_interval=0.005, backoff=2.0,
+                 probe=probe_ready, event_source: EventSource = None,
+                 clock=time.perf_counter, wait_signal=_wait_signal):
         """
         :param base_timeout: 基础超时时间（默认10秒）
-        :param base_interval: 检查间隔（默认0.5秒）
+        :param base_interval: 最大检查间隔（默认0.25秒）
+        :param initial_interval: 首次检查间隔（默认5毫秒），之后按backoff倍数增长
+        :param backoff: 退避倍数
+        :param probe: 就绪探测函数，接收控件返回bool
+        :param event_source: 可选事件源，有事件时立即重新探测
+        :param clock: 计时函数（秒）
+        :param wait_signal: 等待事件或间隔到期的函数 (signal, timeout) -> 是否有事件；与clock一起可替换为模拟时钟
         """
         self.base_timeout = base_timeout
         self.base_interval = base_interval
+        self.initial_interval = initial_interval
+        self.backoff = backoff
+        self.probe = probe
+        self.event_source = event_source
+        self.clock = clock
+        self.wait_signal = wait_signal
+        self.stats = WaitStats()
 
-    def until_element_ready(self, control):
+    def until_element_ready(self, control, timeout=None, probe=None):
         """
         等待控件准备就绪（存在、可见、可操作）
+        :param probe: 本次等待使用的探测函数，默认使用实例的probe
         """
-        end_time = time.time() + self.base_timeout
-        while time.time() < end_time:
-            if control.exists() and control.is_visible() and control.is_enabled():
-                return True
-            print("等待控件出现")
-            time.sleep(self.base_interval)
+        timeout = self.base_timeout if timeout is None else timeout
+        probe = probe or self.probe
+        start = self.clock()
+        deadline = start + timeout
+        interval = self.initial_interval
+        signal = threading.Event()
+        if self.event_source is not None:
+            self.event_source.add_listener(signal)
+        try:
+            while True:
+                if probe(control):
+                    self._record(self.clock() - start, True)
+                    return True
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    break
+                self.wait_signal(signal, min(interval, remaining))
+                signal.clear()
+                interval = min(interval * self.backoff, self.base_interval)
+        finally:
+            if self.event_source is not None:
+                self.event_source.remove_listener(signal)
+
+        elapsed = self.clock() - start
+        self._record(elapsed, False)
+        logger.debug(f"控件等待超时 ({elapsed:.3f}s)")
         raise TimeoutError(f"控件 {control} 超时未就绪")
+
+    def _record(self, duration, ready):
+        self.stats.record(duration, ready)
+        _global_stats.record(duration, ready)
+
+
+@lru_cache(maxsize=1)
+def _wait_config():
+    return read_yaml("configs/settings.yaml").get('wait', {})
+
+
+def create_wait(window=None, base_timeout=10.0) -> SmartWait:
+    """按settings.yaml中的wait配置创建等待引擎"""
+    config = _wait_config()
+    event_source = None
+    if window is not None and config.get('engine', 'poll') == 'event':
+        event_source = UIAEventSource(window)
+    return SmartWait(
+        base_timeout=base_timeout,
+        base_interval=config.get('max_interval', 0.25),
+        initial_interval=config.get('initial_interval', 0.005),
+        backoff=config.get('backoff', 2.0),
+        event_source=event_source,
+    )
@@ -0,0 +1,264 @@
+from typing import Dict, List
+from PyQt5.QtCore import Qt, QAbstractItemModel, QModelIndex
+
+
+class CaseTreeModel(QAbstractItemModel):
+    """
+    用例树模型：两级结构（模块/用例），数据直接来自用例索引
+    - 模块的子行在首次展开时才加载（fetchMore）
+    - 勾选状态不存储在条目中，由TestRunnerModel的选择集合计算
+    - 过滤按ID、模块、名称和描述匹配，新文本包含旧文本时在当前结果中继续筛选
+    """
+
+    HEADERS = ["测试用例", "描述"]
+
+    def __init__(self, selection, parent=None):
+        """
+        :param selection: TestRunnerModel，保存选择状态
+        """
+        super().__init__(parent)
+        self.selection = selection
+        self._cases: Dict[str, List[dict]] = {}  # {模块: [条目]}，按名称排序
+        self._names: Dict[str, frozenset] = {}  # {模块: 全部用例名}
+        self._search_keys: Dict[int, str] = {}  # id(条目) -> 小写的搜索文本
+        self._filter = ""
+        self._visible: List[tuple] = []  # [(模块, [条目])]，过滤后的结果
+        self._loaded: List[bool] = []  # 各模块的子行是否已加载
+        self._row_of: Dict[int, int] = {}  # id(模块用例列表) -> 模块行号
+
+    # ---- 数据 ----
+
+    def set_entries(self, entries: Dict[str, dict]):
+        """由用例索引条目 {相对路径: 元数据} 重建树（勾选状态保留在选择集合中）"""
+        cases = {}
+        for path, entry in entries.items():
+            cases.setdefault(entry['module'], []).append(dict(entry, path=path))
+        self._cases = {module: sorted(items, key=lambda e: e['name']) for module, items in sorted(cases.items())}
+        self._names = {module: frozenset(e['name'] for e in items) for module, items in self._cases.items()}
+        self._search_keys = {id(entry): self._search_key(entry) for items in self._cases.values() for entry in items}
+        self.beginResetModel()
+        self._apply_filter(self._filter, narrowing=False)
+        self.endResetModel()
+
+    def apply_changes(self, changes, entries: Dict[str, dict]):
+        """
+        应用用例索引的增量变化
+        只有内容修改时原地更新条目并整体重绘（过滤中且匹配结果变化时重新过滤）；
+        有增删时重建（勾选状态在选择集合中，不受影响）
+        """
+        if changes.added or changes.removed:
+            self.set_entries(entries)
+            return
+        modified = set(changes.modified)
+        refilter = False
+        for items in self._cases.values():
+            for entry in items:
+                if entry['path'] in modified and entry['path'] in entries:
+                    # 原地更新，保持列表和条目对象不变（索引的内部指针与搜索键依赖它们）
+                    old_key = self._search_keys[id(entry)]
+                    entry.update(entries[entry['path']])
+                    new_key = self._search_keys[id(entry)] = self._search_key(entry)
+                    refilter = refilter or (self._filter in old_key) != (self._filter in new_key)
+        if self._filter and refilter:
+            # 修改后是否匹配过滤条件发生变化，重新过滤
+            self.beginResetModel()
+            self._apply_filter(self._filter, narrowing=False)
+            self.endResetModel()
+            return
+        self._emit_all_changed(roles=None)
+
+    @staticmethod
+    def _search_key(entry) -> str:
+        return "\n".join(str(entry.get(key) or "") for key in ('id', 'module', 'name', 'description')).lower()
+
+    def case_structure(self) -> Dict[str, List[str]]:
+        return {module: [e['name'] for e in items] for module, items in self._cases.items()}
+
+    # ---- 过滤 ----
+
+    def set_filter(self, text: str):
+        text = text.strip().lower()
+        if text == self._filter:
+            return
+        narrowing = bool(self._filter) and self._filter in text
+        self.beginResetModel()
+        self._apply_filter(text, narrowing)
+        self.endResetModel()
+
+    def is_filtered(self) -> bool:
+        return bool(self._filter)
+
+    def _apply_filter(self, text, narrowing):
+        self._filter = text
+        source = self._visible if narrowing else list(self._cases.items())
+        if not text:
+            self._visible = source
+        else:
+            keys = self._search_keys
+            self._visible = []
+            for module, items in source:
+                matched = [e for e in items if text in keys[id(e)]]
+                if matched:
+                    self._visible.append((module, matched))
+        self._loaded = [False] * len(self._visible)
+        self._row_of = {id(items): row for row, (_, items) in enumerate(self._visible)}
+
+    # ---- 勾选 ----
+
+    def set_all_checked(self, checked: bool):
+        """全选/取消全选：模块行发出一次dataChanged，已加载的子行按模块各发出一次"""
+        if self._filter:
+            with self.selection.batch():
+                for module, items in self._visible:
+                    self.selection.update_selection(module, [e['name'] for e in items], checked)
+        elif checked:
+            self.selection.select_all_cases(self.case_structure())
+        else:
+            self.selection.deselect_all_cases()
+        self._emit_all_changed()
+
+    def set_checked(self, indexes, checked: bool):
+        """批量设置多个行的勾选状态"""
+        with self.selection.batch():
+            for index in indexes:
+                if index.isValid() and index.column() == 0:
+                    self._set_check(index, checked)
+        self._emit_all_changed()
+
+    def check_state(self, module: str, names=None) -> int:
+        """模块勾选状态：由已选集合与模块用例集合的交集大小计算"""
+        names = self._names.get(module, frozenset()) if names is None else names
+        selected = len(self.selection.module_selection(module) & names)
+        if not selected:
+            return Qt.Unchecked
+        return Qt.Checked if selected == len(names) else Qt.PartiallyChecked
+
+    def _set_check(self, index, checked):
+        module, entry = self._node(index)
+        if entry is None:
+            items = self._visible[index.row()][1]
+            self.selection.update_selection(module, [e['name'] for e in items], checked)
+        else:
+            self.selection.update_selection(module, [entry['name']], checked)
+
+    def _emit_all_changed(self, roles=(Qt.CheckStateRole,)):
+        """
+        整体刷新：全部模块行，以及已加载（可能已展开）模块的子行
+        :param roles: 变化的数据角色，None表示所有列的全部角色
+        """
+        if not self._visible:
+            return
+        last_column = 0 if roles else self.columnCount() - 1
+        roles = list(roles or [])
+        self.dataChanged.emit(self.index(0, 0), self.index(len(self._visible) - 1, last_column), roles)
+        for row, loaded in enumerate(self._loaded):
+            children = len(self._visible[row][1]) if loaded else 0
+            if children:
+                module_index = self.index(row, 0)
+                self.dataChanged.emit(self.index(0, 0, module_index),
+                                      self.index(children - 1, last_column, module_index), roles)
+
+    # ---- Qt模型接口 ----
+
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column)
+        # 用例行的内部指针为所属模块的用例列表（由_visible持有）
+        return self.createIndex(row, column, self._visible[parent.row()][1])
+
+    def parent(self, index):
+        if not index.isValid() or self._is_module(index):
+            return QModelIndex()
+        return self.createIndex(self._row_of[id(index.internalPointer())], 0)
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return len(self._visible)
+        if self._is_module(parent) and parent.column() == 0:
+            row = parent.row()
+            return len(self._visible[row][1]) if self._loaded[row] else 0
+        return 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.HEADERS)
+
+    def hasChildren(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return bool(self._visible)
+        return self._is_module(parent) and parent.column() == 0
+
+    def canFetchMore(self, parent):
+        return parent.isValid() and self._is_module(parent) and not self._loaded[parent.row()]
+
+    def fetchMore(self, parent):
+        """展开模块时才生成其用例行（视图按可见行渲染，一次插入整个模块）"""
+        row = parent.row()
+        count = len(self._visible[row][1])
+        self.beginInsertRows(parent, 0, count - 1)
+        self._loaded[row] = True
+        self.endInsertRows()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.column() == 0:
+            flags |= Qt.ItemIsUserCheckable
+        return flags
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        module, entry = self._node(index)
+        if entry is None:
+            if role == Qt.DisplayRole:
+                return module if index.column() == 0 else None
+            if role == Qt.CheckStateRole and index.column() == 0:
+                if self._filter:
+                    # 过滤时按可见用例计算，与勾选模块时的作用范围一致
+                    return self.check_state(module, frozenset(e['name'] for e in self._visible[index.row()][1]))
+                return self.check_state(module)
+            return None
+        if role == Qt.DisplayRole:
+            return entry['name'] if index.column() == 0 else entry.get('description') or ""
+        if role == Qt.ToolTipRole:
+            return f"ID: {entry.get('id') or '-'}\n路径: {entry['path']}"
+        if role == Qt.CheckStateRole and index.column() == 0:
+            return Qt.Checked if self.selection.is_selected(module, entry['name']) else Qt.Unchecked
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole or not index.isValid() or index.column() != 0:
+            return False
+        checked = value == Qt.Checked
+        self._set_check(index, checked)
+        if self._is_module(index):
+            # 模块本身与其已加载的子行
+            self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+            children = self.rowCount(index)
+            if children:
+                self.dataChanged.emit(self.index(0, 0, index), self.index(children - 1, 0, index),
+                                      [Qt.CheckStateRole])
+        else:
+            self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+            module_index = index.parent()
+            self.dataChanged.emit(module_index, module_index, [Qt.CheckStateRole])
+        return True
+
+    @staticmethod
+    def _is_module(index):
+        return index.internalPointer() is None
+
+    def _node(self, index):
+        """返回 (模块名, 条目)，模块行的条目为None"""
+        if self._is_module(index):
+            return self._visible[index.row()][0], None
+        items = index.internalPointer()
+        return self._visible[self._row_of[id(items)]][0], items[index.row()]
@@ -0,0 +1,292 @@
+import logging
+import re
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QListView, QComboBox,
+                             QLineEdit, QLabel, QMenu, QApplication, QAbstractItemView)
+from PyQt5.QtCore import Qt, QTimer, QAbstractListModel, QModelIndex
+from PyQt5.QtGui import QFont, QColor
+
+# 从格式化后的日志中解析级别，例如 "2024-01-01 12:00:00 [INFO    ] ..."
+_LEVEL_PATTERN = re.compile(r"\[(DEBUG|INFO|WARNING|ERROR|CRITICAL)\s*\]")
+
+_LEVEL_COLORS = {
+    logging.WARNING: QColor(200, 120, 0),
+    logging.ERROR: QColor(200, 0, 0),
+    logging.CRITICAL: QColor(200, 0, 0),
+}
+
+
+def parse_level(text: str) -> int:
+    match = _LEVEL_PATTERN.search(text)
+    return logging.getLevelName(match.group(1)) if match else logging.INFO
+
+
+class LogListModel(QAbstractListModel):
+    """
+    日志列表模型：固定容量的环形缓冲区，超出容量时丢弃最早的日志
+    过滤结果只保存行对应的序号，视图只读取可见行
+    """
+
+    def __init__(self, capacity=1_000_000, parent=None):
+        super().__init__(parent)
+        self.capacity = capacity
+        self._lines = [None] * capacity  # 序号 seq 的日志存放在 seq % capacity，内容为 (级别, 文本)
+        self._first = 0  # 缓冲区中最早一条日志的序号
+        self._total = 0  # 已写入的日志总数（即下一条日志的序号）
+        self._min_level = logging.NOTSET
+        self._search = ""
+        self._rows = None  # 过滤后的序号列表；None表示不过滤
+        self._row_start = 0  # _rows中已淘汰部分的长度（延迟压缩）
+
+    # ---- Qt模型接口 ----
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        if self._rows is None:
+            return self._total - self._first
+        return len(self._rows) - self._row_start
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        level, text = self._entry(self._seq_of(index.row()))
+        if role == Qt.DisplayRole:
+            return text
+        if role == Qt.ForegroundRole:
+            return _LEVEL_COLORS.get(level)
+        return None
+
+    # ---- 写入 ----
+
+    def append_records(self, records):
+        """批量追加日志 [(级别, 文本)]，每批只发出一次删除/插入通知"""
+        if not records:
+            return
+        if len(records) >= self.capacity:
+            self.beginResetModel()
+            self._total += len(records) - self.capacity
+            self._first = self._total
+            self._write(records[-self.capacity:])
+            self._rebuild_rows()
+            self.endResetModel()
+            return
+
+        new_first = max(self._first, self._total + len(records) - self.capacity)
+        if new_first > self._first:
+            self._evict(new_first)
+
+        first_new = self._total
+        self._write(records)
+        if self._rows is None:
+            new_rows = len(records)
+        else:
+            matched = [seq for seq in range(first_new, self._total) if self._match(*self._entry(seq))]
+            new_rows = len(matched)
+        if not new_rows:
+            return
+        start = self.rowCount()
+        self.beginInsertRows(QModelIndex(), start, start + new_rows - 1)
+        if self._rows is not None:
+            self._rows.extend(matched)
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self._lines = [None] * self.capacity
+        self._first = self._total = 0
+        if self._rows is not None:
+            self._rows, self._row_start = [], 0
+        self.endResetModel()
+
+    # ---- 过滤 ----
+
+    def set_filter(self, min_level=None, search=None):
+        """
+        设置级别过滤和搜索文本（不区分大小写）
+        新搜索文本包含旧文本且级别不降低时，只在当前结果中继续筛选
+        """
+        min_level = self._min_level if min_level is None else min_level
+        search = self._search if search is None else search.lower()
+        if min_level == self._min_level and search == self._search:
+            return
+        narrowing = self._rows is not None and min_level >= self._min_level and self._search in search
+        self._min_level, self._search = min_level, search
+
+        self.beginResetModel()
+        if not self.is_filtered():
+            self._rows, self._row_start = None, 0
+        elif narrowing:
+            self._rows = [seq for seq in self._rows[self._row_start:] if self._match(*self._entry(seq))]
+            self._row_start = 0
+        else:
+            self._rebuild_rows()
+        self.endResetModel()
+
+    def is_filtered(self) -> bool:
+        return self._min_level > logging.NOTSET or bool(self._search)
+
+    def total_count(self) -> int:
+        """缓冲区中的日志条数（不考虑过滤）"""
+        return self._total - self._first
+
+    def text_at(self, row: int) -> str:
+        return self._entry(self._seq_of(row))[1]
+
+    # ---- 内部 ----
+
+    def _entry(self, seq):
+        return self._lines[seq % self.capacity]
+
+    def _seq_of(self, row):
+        if self._rows is None:
+            return self._first + row
+        return self._rows[self._row_start + row]
+
+    def _write(self, records):
+        for record in records:
+            self._lines[self._total % self.capacity] = record
+            self._total += 1
+
+    def _match(self, level, text):
+        return level >= self._min_level and (not self._search or self._search in text.lower())
+
+    def _rebuild_rows(self):
+        self._rows = None
+        if self.is_filtered():
+            self._rows = [
+                seq for seq in range(self._first, self._total) if self._match(*self._entry(seq))
+            ]
+        self._row_start = 0
+
+    def _evict(self, new_first):
+        """淘汰序号小于new_first的日志（其位置即将被新日志覆盖）"""
+        if self._rows is None:
+            count = new_first - self._first
+        else:
+            rows, start = self._rows, self._row_start
+            count = 0
+            while start + count < len(rows) and rows[start + count] < new_first:
+                count += 1
+        if count:
+            self.beginRemoveRows(QModelIndex(), 0, count - 1)
+        self._first = new_first
+        if self._rows is not None:
+            self._row_start += count
+            if self._row_start > len(self._rows) // 2:
+                # 延迟压缩，摊销删除列表头部的开销
+                del self._rows[:self._row_start]
+                self._row_start = 0
+        if count:
+            self.endRemoveRows()
+
+
+class LogView(QWidget):
+    """虚拟化日志视图：级别过滤、增量搜索、定时批量追加"""
+
+    LEVELS = [("全部", logging.NOTSET), ("DEBUG", logging.DEBUG), ("INFO", logging.INFO),
+              ("WARNING", logging.WARNING), ("ERROR", logging.ERROR)]
+
+    def __init__(self, capacity=1_000_000, update_interval=100, parent=None):
+        super().__init__(parent)
+        self.auto_scroll = True
+        self._pending = []
+        self.model = LogListModel(capacity, self)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("级别:"))
+        self.level_combo = QComboBox()
+        for name, level in self.LEVELS:
+            self.level_combo.addItem(name, level)
+        self.level_combo.currentIndexChanged.connect(self._apply_level)
+        filter_layout.addWidget(self.level_combo)
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("搜索日志...")
+        self.search_edit.setClearButtonEnabled(True)
+        filter_layout.addWidget(self.search_edit)
+        self.count_label = QLabel()
+        filter_layout.addWidget(self.count_label)
+        layout.addLayout(filter_layout)
+
+        self.list_view = QListView()
+        self.list_view.setModel(self.model)
+        self.list_view.setUniformItemSizes(True)  # 行高一致，视图无需逐行测量
+        self.list_view.setFont(QFont("Consolas", 10))
+        self.list_view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.list_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.list_view.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.list_view.customContextMenuRequested.connect(self.show_context_menu)
+        layout.addWidget(self.list_view)
+
+        # 输入停顿后再搜索，避免每个按键都扫描全部日志
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(200)
+        self._search_timer.timeout.connect(self._apply_search)
+        self.search_edit.textChanged.connect(self._search_timer.start)
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.timeout.connect(self.flush)
+        self._flush_timer.start(update_interval)
+
+    def append(self, message: str):
+        """追加一条格式化后的日志（定时批量写入模型）"""
+        self._pending.append((parse_level(message), message))
+
+    def append_records(self, records):
+        """追加 [(级别, 文本)]"""
+        self._pending.extend(records)
+
+    def flush(self):
+        if not self._pending:
+            return
+        records, self._pending = self._pending, []
+        self.model.append_records(records)
+        self._update_count()
+        if self.auto_scroll:
+            self.list_view.scrollToBottom()
+
+    def clear(self):
+        self._pending = []
+        self.model.clear()
+        self._update_count()
+
+    def toggle_auto_scroll(self):
+        self.auto_scroll = not self.auto_scroll
+        return self.auto_scroll
+
+    def copy_selection(self):
+        rows = sorted(index.row() for index in self.list_view.selectionModel().selectedIndexes())
+        if rows:
+            QApplication.clipboard().setText("\n".join(self.model.text_at(row) for row in rows))
+
+    def show_context_menu(self, position):
+        menu = QMenu()
+        copy_action = menu.addAction("复制")
+        clear_action = menu.addAction("清除")
+        toggle_scroll_action = menu.addAction("切换自动滚动")
+
+        action = menu.exec_(self.list_view.mapToGlobal(position))
+
+        if action == copy_action:
+            self.copy_selection()
+        elif action == clear_action:
+            self.clear()
+        elif action == toggle_scroll_action:
+            self.toggle_auto_scroll()
+
+    def _apply_level(self):
+        self.model.set_filter(min_level=self.level_combo.currentData())
+        self._update_count()
+
+    def _apply_search(self):
+        self.model.set_filter(search=self.search_edit.text())
+        self._update_count()
+
+    def _update_count(self):
+        if self.model.is_filtered():
+            self.count_label.setText(f"{self.model.rowCount()}/{self.model.total_count()} 行")
+        else:
+            self.count_label.setText(f"{self.model.total_count()} 行")
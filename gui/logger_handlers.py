@@ -1,26 +1,99 @@
 import logging
+import threading
 
 class QTextEditLogger(logging.Handler):
-    """将日志重定向到QTextEdit的自定义日志处理器"""
-    def __init__(self, signal):
+    """
+    将日志重定向到GUI的自定义日志处理器
+    日志在后台线程中按时间片合并，每批只发出一次信号；界面处理完一批后调用acknowledge()确认
+    未确认的批次达到上限时暂停发送，积压（待发送加未确认的条数）过多时对低级别日志采样或丢弃，
+    WARNING及以上始终保留
+    """
+    def __init__(self, signal, interval=0.1, soft_limit=2000, hard_limit=10000, sample_every=10, max_in_flight=2):
         """
         初始化日志处理器
 
         Args:
-            signal: PyQt信号，用于发送日志消息到GUI
+            signal: PyQt信号，参数为 [(级别, 文本)]，用于发送日志批次到GUI
+            interval: 合并发送的时间片（秒）
+            soft_limit: 积压条数超过该值后，低级别日志每sample_every条保留1条
+            hard_limit: 积压条数超过该值后，低级别日志全部丢弃
+            sample_every: 采样间隔
+            max_in_flight: 界面尚未确认的批次上限，达到后暂停发送直到界面确认
         """
         super().__init__()
         self.signal = signal
+        self.interval = interval
+        self.soft_limit = soft_limit
+        self.hard_limit = hard_limit
+        self.sample_every = sample_every
+        self.max_in_flight = max_in_flight
         self.setFormatter(logging.Formatter(
             '%(asctime)s [%(levelname)-8s] %(filename)s:%(lineno)d - %(message)s'
         ))
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._in_flight = 0  # 已发出、界面尚未确认的批次数
+        self._in_flight_records = 0  # 及其中的记录条数
+        self._dropped = 0
+        self._sample_counter = 0
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._run, name="gui-log-flusher", daemon=True)
+        self._flusher.start()
 
     def emit(self, record):
         """
-        发出日志记录
+        缓存日志记录，由后台线程批量发送
 
         Args:
             record: 日志记录对象
         """
-        msg = self.format(record)
-        self.signal.emit(msg)
\ No newline at end of file
+        with self._pending_lock:
+            backlog = len(self._pending) + self._in_flight_records
+            if record.levelno < logging.WARNING and backlog >= self.soft_limit:
+                self._sample_counter += 1
+                if backlog >= self.hard_limit or self._sample_counter % self.sample_every:
+                    self._dropped += 1
+                    return
+        try:
+            msg = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self._pending_lock:
+            self._pending.append((record.levelno, msg))
+
+    def flush(self):
+        """立即发送当前缓存的日志（不受未确认批次数限制）"""
+        with self._pending_lock:
+            batch, self._pending = self._pending, []
+            dropped, self._dropped = self._dropped, 0
+            if dropped:
+                batch.append((logging.WARNING, f"[日志限流] 积压过多，已丢弃 {dropped} 条低级别日志"))
+            if batch:
+                self._in_flight += 1
+                self._in_flight_records += len(batch)
+        if batch:
+            self.signal.emit(batch)
+
+    def acknowledge(self, batch):
+        """界面线程处理完一批日志后调用"""
+        with self._pending_lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._in_flight_records = max(0, self._in_flight_records - len(batch))
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+        super().close()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._pending_lock:
+                busy = self._in_flight >= self.max_in_flight
+            if busy:
+                continue  # 界面未跟上，日志留在待发送列表中并参与限流
+            try:
+                self.flush()
+            except RuntimeError:
+                # 界面已销毁，信号对象失效
+                break
@@ -0,0 +1,128 @@
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Callable, Iterable
+
+logger = logging.getLogger("gui.test_process")
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+class TestProcess:
+    """
+    在子进程中执行测试（run.py --cli --event-stream），逐行读取JSON事件
+    测试期间的内存（用例计划、截图、日志）都在子进程中，进程退出即全部释放
+    回调在读取线程中执行，GUI需自行转发到界面线程
+    """
+
+    def __init__(self, case_paths: Iterable[str], on_event: Callable[[dict], None],
+                 on_exit: Callable[[int, str], None], extra_args: Iterable[str] = ()):
+        """
+        :param case_paths: 要执行的用例相对路径
+        :param on_event: 收到事件时的回调，参数为事件字典
+        :param on_exit: 子进程退出后的回调，参数为 (返回码, 标准错误末尾的输出)
+        :param extra_args: 附加的run.py参数
+        """
+        self.case_paths = list(case_paths)
+        self.on_event = on_event
+        self.on_exit = on_exit
+        self.extra_args = list(extra_args)
+        self.proc = None
+        self._case_list = None
+        self._stderr_tail = deque(maxlen=50)
+        self._stderr_thread = None
+        self.outcomes = {}  # {结果: 用例数}，由case_finished事件累计
+        self.session_result = None  # session_finished事件；子进程崩溃或被终止时为None
+        self.killed = False
+
+    def start(self):
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".txt", prefix="tlv_cases_",
+                                         delete=False) as f:
+            f.write("\n".join(self.case_paths))
+            self._case_list = f.name
+        cmd = [sys.executable, str(PROJECT_ROOT / "run.py"), "--cli", "--no-report", "--event-stream",
+               f"--case-list={self._case_list}", *self.extra_args]
+        logger.info(f"启动测试子进程: {' '.join(cmd)}")
+        # 独立进程组，强制终止时连同子进程启动的TLV一起结束
+        group = ({"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP} if os.name == "nt"
+                 else {"start_new_session": True})
+        self.proc = subprocess.Popen(
+            cmd, cwd=str(PROJECT_ROOT), stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, encoding="utf-8", errors="replace", bufsize=1, **group
+        )
+        self._stderr_thread = threading.Thread(target=self._drain_stderr, name="test-process-stderr", daemon=True)
+        self._stderr_thread.start()
+        threading.Thread(target=self._read_events, name="test-process-events", daemon=True).start()
+
+    @property
+    def finished_count(self) -> int:
+        return sum(self.outcomes.values())
+
+    def is_running(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def stop(self):
+        """请求子进程在当前用例结束后停止（报告和已完成用例的结果保留）"""
+        if not self.is_running():
+            return
+        try:
+            self.proc.stdin.write("stop\n")
+            self.proc.stdin.flush()
+        except (OSError, ValueError):
+            pass
+
+    def kill(self):
+        """强制终止子进程及其启动的所有进程"""
+        if not self.is_running():
+            return
+        logger.warning(f"强制终止测试子进程: {self.proc.pid}")
+        self.killed = True
+        try:
+            if os.name == "nt":
+                subprocess.run(["taskkill", "/F", "/T", "/PID", str(self.proc.pid)], capture_output=True)
+            else:
+                os.killpg(self.proc.pid, signal.SIGKILL)
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.error(f"终止进程组失败: {str(e)}")
+            self.proc.kill()
+
+    def _read_events(self):
+        try:
+            for line in self.proc.stdout:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    self._stderr_tail.append(line)
+                    continue
+                if event.get("event") == "case_finished":
+                    self.outcomes[event["outcome"]] = self.outcomes.get(event["outcome"], 0) + 1
+                elif event.get("event") == "session_finished":
+                    self.session_result = event
+                try:
+                    self.on_event(event)
+                except Exception as e:
+                    logger.error(f"处理测试事件失败: {str(e)}", exc_info=True)
+        finally:
+            returncode = self.proc.wait()
+            self._stderr_thread.join(1.0)
+            if self._case_list:
+                try:
+                    os.unlink(self._case_list)
+                except OSError:
+                    pass
+            self.on_exit(returncode, "\n".join(self._stderr_tail))
+
+    def _drain_stderr(self):
+        # 子进程的控制台日志和pytest输出写在标准错误，必须持续读取以免管道写满阻塞子进程
+        for line in self.proc.stderr:
+            self._stderr_tail.append(line.rstrip("\n"))
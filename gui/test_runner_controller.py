@@ -1,106 +1,115 @@
-import pytest
 import logging
 import subprocess
-from concurrent.futures import ThreadPoolExecutor
 from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot, QTimer, Qt
 from PyQt5.QtWidgets import QApplication
+from gui.case_tree_model import CaseTreeModel
 from gui.test_runner_model import TestRunnerModel
 from gui.test_runner_view import TestRunnerView
 from gui.logger_handlers import QTextEditLogger
-from tests import test_suite
-from utils.logger_config import configure_logger
+from gui.test_process import TestProcess
+from utils.case_watcher import CaseWatcher
+from utils.logger_config import add_log_handler, configure_logger, remove_log_handler
 
 class TestRunnerController(QObject):
     class TestSignals(QObject):
         test_completed = pyqtSignal(bool, str, int)
         status_update = pyqtSignal(str)
-        log_update = pyqtSignal(str)
+        log_update = pyqtSignal(list)  # [(级别, 文本)]
+        cases_changed = pyqtSignal(object)  # CaseChanges
+        run_event = pyqtSignal(dict)  # 测试子进程的执行事件
 
     def __init__(self):
         super().__init__()
         self.model = TestRunnerModel()
         self.view = TestRunnerView()
         self.signals = self.TestSignals()
-        self.thread_pool = ThreadPoolExecutor(max_workers=1)
-        self.current_test_future = None
+        self.case_tree = CaseTreeModel(self.model)
+        self.view.set_case_model(self.case_tree)
+        self.test_process = None
         self.gui_handler = None
 
         self.connect_signals()
         self.setup_logging()
         self.load_case_structure()
 
+        # 监视用例目录，编辑YAML后增量更新索引和用例树（回调在监视线程，经信号转到界面线程）
+        self.case_watcher = CaseWatcher(self.signals.cases_changed.emit)
+        self.case_watcher.start()
+
     def __del__(self):
         """清理资源"""
+        if getattr(self, 'case_watcher', None):
+            self.case_watcher.stop()
+
         if self.gui_handler:
-            root_logger = logging.getLogger()
-            root_logger.removeHandler(self.gui_handler)
+            remove_log_handler(self.gui_handler)
+            self.gui_handler.close()
+
+        self.model.flush()
 
-        if hasattr(self, 'thread_pool'):
-            self.thread_pool.shutdown(wait=True)
+        if getattr(self, 'test_process', None):
+            self.test_process.kill()
 
     def connect_signals(self):
         """连接所有信号和槽"""
-        self.view.item_changed.connect(self.on_item_changed)
         self.view.run_tests_signal.connect(self.run_tests)
+        self.view.stop_tests_signal.connect(self.stop_tests)
+        self.view.kill_tests_signal.connect(self.kill_tests)
         self.view.select_all_signal.connect(self.select_all)
         self.view.deselect_all_signal.connect(self.deselect_all)
         self.view.open_report_signal.connect(self.view.open_allure_report)
         self.signals.test_completed.connect(self.handle_test_completion)
         self.signals.status_update.connect(self.view.update_status)
-        self.signals.log_update.connect(self.view.append_log)
+        self.signals.log_update.connect(self.on_log_batch)
+        self.signals.cases_changed.connect(self.on_cases_changed)
+        self.signals.run_event.connect(self.on_run_event)
 
     def setup_logging(self):
         """设置日志系统"""
         # 配置根日志记录器
-        root_logger, _, _ = configure_logger()
+        configure_logger()
 
         # 添加自定义处理器，将日志重定向到GUI
         self.gui_handler = QTextEditLogger(self.signals.log_update)
         self.gui_handler.setLevel(logging.DEBUG)
-        root_logger.addHandler(self.gui_handler)
+        add_log_handler(self.gui_handler)
 
         logging.info("日志系统初始化完成")
 
+    def on_log_batch(self, records):
+        """本进程的日志批次：显示后向日志处理器确认，处理器据此控制发送节奏"""
+        self.view.append_log_batch(records)
+        if self.gui_handler is not None:
+            self.gui_handler.acknowledge(records)
+
     def load_case_structure(self):
         """加载测试用例结构"""
-        case_structure = self.model.load_case_structure()
-        self.view.load_case_structure(case_structure)
-
-    def on_item_changed(self, item, column):
-        """处理测试用例选择状态改变"""
-        if item.parent() is None:
-            # 处理父节点（模块）的改变
-            module = item.text(0)
-            check_state = item.checkState(0)
-            for i in range(item.childCount()):
-                case_item = item.child(i)
-                case_name = case_item.text(0)
-                self.model.update_selected_cases(module, case_name, check_state == Qt.Checked)
-        else:
-            # 处理子节点（测试用例）的改变
-            module = item.parent().text(0)
-            case_name = item.text(0)
-            check_state = item.checkState(0)
-            self.model.update_selected_cases(module, case_name, check_state == Qt.Checked)
+        self.case_tree.set_entries(self.model.load_case_entries())
+
+    def on_cases_changed(self, changes):
+        """用例目录变化：增量更新用例树，未变化用例的勾选状态保持不变"""
+        entries = self.model.apply_case_changes(changes)
+        self.case_tree.apply_changes(changes, entries)
+        logging.info(f"用例已更新: 新增 {len(changes.added)}, 修改 {len(changes.modified)}, 删除 {len(changes.removed)}")
 
     def select_all(self):
-        """选择所有测试用例"""
-        case_structure = self.model.load_case_structure()
-        self.model.select_all_cases(case_structure)
-        self.view.select_all_items()
+        """选择所有测试用例（过滤时只选择可见用例）"""
+        with self.model.batch():
+            self.case_tree.set_all_checked(True)
 
     def deselect_all(self):
-        """取消选择所有测试用例"""
-        self.model.deselect_all_cases()
-        self.view.deselect_all_items()
+        """取消选择所有测试用例（过滤时只取消可见用例）"""
+        with self.model.batch():
+            self.case_tree.set_all_checked(False)
 
     def run_tests(self):
-        """运行选中的测试用例"""
-        if not self.model.selected_cases:
+        """在子进程中运行选中的测试用例"""
+        selected_cases = self.model.selected_cases
+        if not selected_cases:
             self.view.show_warning('警告', '请至少选择一个测试用例')
             return
 
-        if self.current_test_future and not self.current_test_future.done():
+        if self.test_process and self.test_process.is_running():
             self.view.show_warning('警告', '测试正在执行中，请等待当前测试完成')
             return
 
@@ -109,37 +118,72 @@ class TestRunnerController(QObject):
             self.view.clear_status()
             self.view.clear_log()
 
-            # 获取选中的用例
-            cases = self.model.get_selected_cases()
-            test_suite.CASES.clear()
-            test_suite.CASES.extend(cases)
-
             # 显示正在执行的状态
             selected_cases_info = ", ".join([
                 f"{module}:{case}"
-                for module, cases_list in self.model.selected_cases.items()
+                for module, cases_list in selected_cases.items()
                 for case in cases_list
             ])
             self.signals.status_update.emit(f"正在执行测试用例: {selected_cases_info}")
 
-            # 使用线程池执行测试
-            self.current_test_future = self.thread_pool.submit(self.run_test_thread)
+            # 事件和退出回调在读取线程中，经信号转到界面线程
+            self.test_process = TestProcess(
+                self.model.get_selected_paths(), self.signals.run_event.emit, self.on_process_exit
+            )
+            self.test_process.start()
+            self.view.set_running(True)
 
         except Exception as e:
+            self.view.set_running(False)
             self.view.show_error('错误', f'执行测试时出错: {str(e)}')
             logging.error(f"执行测试时出错: {str(e)}", exc_info=True)
 
-    def run_test_thread(self):
-        """在独立线程中运行测试"""
+    def stop_tests(self):
+        """当前用例结束后停止"""
+        if self.test_process and self.test_process.is_running():
+            self.test_process.stop()
+            self.signals.status_update.emit("正在停止: 当前用例结束后停止执行...")
+
+    def kill_tests(self):
+        """立即终止测试子进程"""
+        if self.test_process and self.test_process.is_running():
+            self.test_process.kill()
+
+    def on_run_event(self, event):
+        """处理子进程的执行事件（界面线程）"""
+        kind = event.get("event")
+        if kind == "log":
+            self.view.append_log_batch([tuple(record) for record in event["records"]])
+        elif kind == "session_started":
+            self.view.update_status(f"共 {event['total']} 个测试用例")
+        elif kind == "case_started":
+            self.view.update_status(f"▶ {event['case_id']}")
+        elif kind == "validation" and not event["passed"]:
+            self.view.update_status(
+                f"  ✗ 步骤{event['step']} {event['property']}: 预期 {event['expected']}, 实际 {event['actual']}"
+            )
+        elif kind == "case_finished":
+            mark = {"passed": "✓", "failed": "✗", "skipped": "-"}.get(event["outcome"], "?")
+            self.view.update_status(f"{mark} {event['case_id']} ({event['duration']:.1f}s) {event['message']}")
+        elif kind == "progress":
+            self.view.update_progress(event)
+        elif kind == "stop_requested":
+            self.view.update_status("已收到停止请求")
+
+    def on_process_exit(self, returncode, stderr_tail):
+        """子进程退出后生成报告并通知界面（读取线程中执行）"""
+        process = self.test_process
+        case_count = process.finished_count
         try:
-            # 运行测试
-            self.signals.status_update.emit("测试执行中...")
-            logging.info("开始执行测试用例")
-
-            # 运行pytest，不捕获其输出
-            pytest_result = pytest.main(['--capture=no', '-v', 'tests/test_suite.py'])
-
-            if pytest_result == 0:  # 测试成功
+            if process.killed:
+                self.signals.test_completed.emit(False, f"测试已被强制终止，已完成 {case_count} 个用例", case_count)
+                return
+            if process.session_result is None:
+                logging.error(f"测试子进程异常退出，返回码: {returncode}\n{stderr_tail}")
+                self.signals.test_completed.emit(False, f"测试子进程异常退出，返回码: {returncode}", case_count)
+                return
+
+            if returncode == 0:  # 测试成功
                 # 生成报告
                 self.signals.status_update.emit("生成测试报告...")
 
@@ -161,19 +205,22 @@ class TestRunnerController(QObject):
                     logging.error("未找到allure命令，请确保已正确安装allure")
 
                 # 完成测试
-                self.signals.test_completed.emit(True, "测试完成", len(self.model.get_selected_cases()))
+                self.signals.test_completed.emit(True, "测试完成", case_count)
             else:
                 error_msg = "测试执行失败，请查看日志了解详细信息"
+                if process.session_result.get("stopped"):
+                    error_msg = f"测试已停止，已完成 {case_count} 个用例"
                 logging.error(error_msg)
-                self.signals.test_completed.emit(False, error_msg, 0)
+                self.signals.test_completed.emit(False, error_msg, case_count)
 
         except Exception as e:
             logging.error(f"测试执行失败: {str(e)}", exc_info=True)
-            self.signals.test_completed.emit(False, str(e), 0)
+            self.signals.test_completed.emit(False, str(e), case_count)
 
     @pyqtSlot(bool, str, int)
     def handle_test_completion(self, success, message, case_count):
         """处理测试完成的回调"""
+        self.view.set_running(False)
         if success:
             status_msg = f"测试完成: 成功执行了 {case_count} 个测试用例"
             self.signals.status_update.emit(status_msg)
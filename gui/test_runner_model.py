@@ -1,77 +1,163 @@
+import os
 import sys
 import json
 import logging
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from collections import defaultdict
-from typing import Dict, List, Set
+from typing import Dict, Iterable, List, Set
 
 # 添加项目根目录到sys.path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from utils.data_loader import get_case_structure, generate_selected_cases
+from utils.case_repository import get_repository
+from utils.data_loader import generate_selected_cases
 
 class TestRunnerModel:
+    SAVE_DELAY = 0.5  # 选择状态写盘的防抖时间（秒），同一次操作内的多次修改只写一次
+
     def __init__(self):
-        self.selected_cases: Dict[str, List[str]] = defaultdict(list)  # 存储选中的用例 {module: [case_name1, case_name2, ...]}
-        self.case_structure: Dict[str, Set[str]] = {}  # 缓存用例结构
+        self._selection: Dict[str, Set[str]] = {}  # 选中的用例 {module: {case_name1, case_name2, ...}}
+        self.case_structure: Dict[str, List[str]] = {}  # 缓存用例结构
         self.config_path = Path(__file__).parent.parent / "configs" / "test_selection.json"
+        self._lock = threading.Lock()
+        self._save_timer = None
+        self._batch_depth = 0
         self.load_saved_selection()
 
-    def load_case_structure(self):
-        """加载用例结构并缓存"""
+    @property
+    def selected_cases(self) -> Dict[str, List[str]]:
+        """选中的用例 {module: [case_name, ...]}（按名称排序的副本）"""
+        with self._lock:
+            return {module: sorted(cases) for module, cases in self._selection.items()}
+
+    def is_selected(self, module: str, case_name: str) -> bool:
+        return case_name in self._selection.get(module, ())
+
+    def module_selection(self, module: str) -> Set[str]:
+        """模块下已选中的用例名（只读）"""
+        return self._selection.get(module, frozenset())
+
+    def load_case_entries(self) -> Dict[str, dict]:
+        """刷新用例索引并返回条目 {相对路径: 元数据}，同时缓存用例结构"""
         try:
-            self.case_structure = get_case_structure()
-            return self.case_structure
+            repository = get_repository()
+            repository.refresh()
+            self.case_structure = repository.get_structure()
+            return repository.entries()
         except Exception as e:
             logging.error(f"加载用例结构失败: {str(e)}", exc_info=True)
             return {}
 
+    def apply_case_changes(self, changes) -> Dict[str, dict]:
+        """
+        用例目录变化后更新缓存的结构，并从选择中移除已删除的用例（其余用例的选择保持不变）
+        :return: 最新的索引条目
+        """
+        entries = get_repository().entries()
+        self.case_structure = get_repository().get_structure()
+        if changes.removed:
+            with self.batch():
+                for path in changes.removed:
+                    # 与用例索引的模块名一致（根目录下的用例为 "."）
+                    self.update_selected_cases(Path(path).parent.as_posix(), Path(path).stem, False)
+        return entries
+
+    def load_case_structure(self):
+        """加载用例结构并缓存"""
+        self.load_case_entries()
+        return self.case_structure
+
+    @contextmanager
+    def batch(self):
+        """批量修改：退出时只安排一次保存"""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            self.schedule_save()
+
     def update_selected_cases(self, module: str, case_name: str, is_selected: bool):
-        """更新选中的用例"""
+        """更新单个用例的选中状态"""
+        self.update_selection(module, [case_name], is_selected)
+
+    def update_selection(self, module: str, case_names: Iterable[str], is_selected: bool):
+        """批量更新同一模块下用例的选中状态"""
         if not module:
             logging.warning("更新选中用例时模块名为空")
             return
 
-        if is_selected:
-            if case_name not in self.selected_cases[module]:
-                self.selected_cases[module].append(case_name)
-        else:
-            if case_name in self.selected_cases[module]:
-                self.selected_cases[module].remove(case_name)
-                if not self.selected_cases[module]:
-                    del self.selected_cases[module]
+        with self._lock:
+            if is_selected:
+                self._selection.setdefault(module, set()).update(case_names)
+            elif module in self._selection:
+                cases = self._selection[module]
+                cases.difference_update(case_names)
+                if not cases:
+                    del self._selection[module]
 
         # 保存选择状态
-        self.save_selection()
+        self.schedule_save()
 
     def select_all_cases(self, case_structure):
         """选择所有用例"""
-        self.selected_cases = defaultdict(list)
-        for module, cases in case_structure.items():
-            self.selected_cases[module] = list(cases)
-        self.save_selection()
+        with self._lock:
+            self._selection = {module: set(cases) for module, cases in case_structure.items() if cases}
+        self.schedule_save()
 
     def deselect_all_cases(self):
         """取消选择所有用例"""
-        self.selected_cases.clear()
-        self.save_selection()
+        with self._lock:
+            self._selection = {}
+        self.schedule_save()
 
     def get_selected_cases(self):
         """获取选中的用例"""
         try:
-            return generate_selected_cases(dict(self.selected_cases))
+            return generate_selected_cases(self.selected_cases)
         except Exception as e:
             logging.error(f"生成选中用例失败: {str(e)}", exc_info=True)
             return []
 
+    def get_selected_paths(self) -> List[str]:
+        """选中用例相对用例目录的路径（传给测试子进程）"""
+        return [
+            f"{module}/{case_name}.yaml"
+            for module, case_names in self.selected_cases.items()
+            for case_name in case_names
+        ]
+
+    def schedule_save(self):
+        """防抖保存：在最后一次修改之后SAVE_DELAY秒写盘"""
+        if self._batch_depth:
+            return
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            # 非守护线程，退出前未完成的保存仍会执行
+            self._save_timer = threading.Timer(self.SAVE_DELAY, self.save_selection)
+            self._save_timer.start()
+
+    def flush(self):
+        """立即写出尚未保存的选择状态"""
+        with self._lock:
+            timer, self._save_timer = self._save_timer, None
+        if timer is not None:
+            timer.cancel()
+            self.save_selection()
+
     def save_selection(self):
-        """保存选择状态到文件"""
+        """保存选择状态到文件（先写临时文件再原子替换）"""
         try:
+            snapshot = self.selected_cases
             # 确保目录存在
             self.config_path.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(dict(self.selected_cases), f, ensure_ascii=False, indent=2)
+            tmp_path = self.config_path.with_suffix(".json.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.config_path)
         except Exception as e:
             logging.error(f"保存选择状态失败: {str(e)}", exc_info=True)
 
@@ -81,11 +167,8 @@ class TestRunnerModel:
             if self.config_path.exists():
                 with open(self.config_path, 'r', encoding='utf-8') as f:
                     saved_selection = json.load(f)
-                    # 转换为defaultdict
-                    self.selected_cases = defaultdict(list)
-                    for module, cases in saved_selection.items():
-                        self.selected_cases[module] = cases
+                    self._selection = {module: set(cases) for module, cases in saved_selection.items() if cases}
                     logging.info("已加载保存的测试用例选择状态")
         except Exception as e:
             logging.error(f"加载选择状态失败: {str(e)}", exc_info=True)
-            self.selected_cases = defaultdict(list)
\ No newline at end of file
+            self._selection = {}
@@ -1,79 +1,29 @@
-from PyQt5.QtWidgets import (QMainWindow, QTreeWidget, QTreeWidgetItem,
+from PyQt5.QtWidgets import (QMainWindow, QTreeView, QLineEdit, QAbstractItemView,
                              QPushButton, QVBoxLayout, QHBoxLayout, QWidget,
                              QLabel, QSplitter, QPlainTextEdit, QMessageBox,
-                             QStatusBar, QAction, QMenu, QShortcut, QApplication)
+                             QStatusBar, QAction, QMenu, QShortcut, QApplication, QProgressBar)
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QSize
 from PyQt5.QtGui import QFont, QTextCursor, QKeySequence, QIcon
 import subprocess
 import os
 import logging
+from gui.log_view import LogView
+from utils.progress import format_duration
 
 # 配置日志记录器
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class LogBuffer:
-    """日志缓冲区，用于提高日志显示性能"""
-    def __init__(self, text_widget, max_lines=1000, update_interval=100):
-        self.text_widget = text_widget
-        self.max_lines = max_lines
-        self.buffer = []
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.flush)
-        self.timer.start(update_interval)  # 每100毫秒更新一次
-        self.auto_scroll = True
-
-    def append(self, text):
-        self.buffer.append(text)
-        # 如果缓冲区过大，立即刷新
-        if len(self.buffer) > 20:
-            self.flush()
-
-    def flush(self):
-        if not self.buffer:
-            return
-
-        # 保存当前光标位置和选择
-        cursor = self.text_widget.textCursor()
-        current_position = cursor.position()
-        anchor_position = cursor.anchor()
-
-        # 将缓冲区中的所有文本一次性添加到文本控件
-        text = "\n".join(self.buffer)
-        self.text_widget.appendPlainText(text)
-        self.buffer.clear()
-
-        # 限制显示的行数
-        document = self.text_widget.document()
-        if document.blockCount() > self.max_lines:
-            remove_cursor = QTextCursor(document.findBlockByNumber(0))
-            remove_cursor.select(QTextCursor.BlockUnderCursor)
-            remove_cursor.removeSelectedText()
-            remove_cursor.deleteChar()  # 删除换行符
-
-        # 恢复光标位置和选择
-        cursor.setPosition(anchor_position)
-        cursor.setPosition(current_position, QTextCursor.KeepAnchor)
-        self.text_widget.setTextCursor(cursor)
-
-        # 如果启用了自动滚动，则滚动到底部
-        if self.auto_scroll:
-            self.text_widget.moveCursor(QTextCursor.End)
-
-    def toggle_auto_scroll(self):
-        self.auto_scroll = not self.auto_scroll
-        return self.auto_scroll
-
 class TestRunnerView(QMainWindow):
-    item_changed = pyqtSignal(QTreeWidgetItem, int)
     run_tests_signal = pyqtSignal()
+    stop_tests_signal = pyqtSignal()
+    kill_tests_signal = pyqtSignal()
     select_all_signal = pyqtSignal()
     deselect_all_signal = pyqtSignal()
     open_report_signal = pyqtSignal()
 
     def __init__(self):
         super().__init__()
-        self.log_buffer = None  # 初始化为None，在init_ui中创建
         self.status_bar = self.statusBar()
         self.init_ui()
         self.setup_shortcuts()
@@ -91,6 +41,15 @@ class TestRunnerView(QMainWindow):
         self.setStatusBar(self.statusBar)
         self.statusBar.showMessage('就绪')
 
+        # 执行进度（完成数/总数、通过/失败数和预计剩余时间）
+        self.progress_label = QLabel()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.setFormat("%v/%m")
+        self.progress_bar.setVisible(False)
+        self.statusBar.addPermanentWidget(self.progress_label)
+        self.statusBar.addPermanentWidget(self.progress_bar)
+
         # 创建中心部件和主布局
         central_widget = QWidget()
         main_layout = QVBoxLayout(central_widget)
@@ -157,14 +116,26 @@ class TestRunnerView(QMainWindow):
         top_label = QLabel('测试用例：')
         left_layout.addWidget(top_label)
 
-        # 用例树
-        self.tree_widget = QTreeWidget()
-        self.tree_widget.setHeaderLabels(['测试用例'])
-        self.tree_widget.setColumnWidth(0, 300)
-        self.tree_widget.itemChanged.connect(self.item_changed.emit)
-        self.tree_widget.setContextMenuPolicy(Qt.CustomContextMenu)
-        self.tree_widget.customContextMenuRequested.connect(self.show_tree_context_menu)
-        left_layout.addWidget(self.tree_widget)
+        # 用例过滤（按ID、模块、名称或描述）
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("按ID/模块/描述过滤...")
+        self.filter_edit.setClearButtonEnabled(True)
+        left_layout.addWidget(self.filter_edit)
+
+        # 输入停顿后再过滤
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(200)
+        self._filter_timer.timeout.connect(self.apply_case_filter)
+        self.filter_edit.textChanged.connect(self._filter_timer.start)
+
+        # 用例树（模型在set_case_model中设置，子行展开时才加载）
+        self.tree_view = QTreeView()
+        self.tree_view.setUniformRowHeights(True)
+        self.tree_view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.tree_view.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.tree_view.customContextMenuRequested.connect(self.show_tree_context_menu)
+        left_layout.addWidget(self.tree_view)
 
         # 按钮布局
         button_layout = QHBoxLayout()
@@ -181,6 +152,17 @@ class TestRunnerView(QMainWindow):
         self.run_btn.clicked.connect(self.run_tests_signal.emit)
         button_layout.addWidget(self.run_btn)
 
+        # 停止：当前用例结束后停止；终止：立即结束测试进程
+        self.stop_btn = QPushButton('停止')
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(self.stop_tests_signal.emit)
+        button_layout.addWidget(self.stop_btn)
+
+        self.kill_btn = QPushButton('终止')
+        self.kill_btn.setEnabled(False)
+        self.kill_btn.clicked.connect(self.kill_tests_signal.emit)
+        button_layout.addWidget(self.kill_btn)
+
         left_layout.addLayout(button_layout)
         return left_widget
 
@@ -204,23 +186,9 @@ class TestRunnerView(QMainWindow):
         )
         v_splitter.addWidget(self.status_display)
 
-        # 下部日志显示
-        self.log_display = QPlainTextEdit()
-        self.log_display.setReadOnly(True)
-        self.log_display.setFont(QFont("Consolas", 10))
-        # 启用文本选择
-        self.log_display.setTextInteractionFlags(
-            Qt.TextSelectableByMouse | Qt.TextSelectableByKeyboard
-        )
-        # 确保能够接收鼠标事件
-        self.log_display.viewport().setCursor(Qt.IBeamCursor)
-        # 设置右键菜单策略
-        self.log_display.setContextMenuPolicy(Qt.CustomContextMenu)
-        self.log_display.customContextMenuRequested.connect(self.show_log_context_menu)
-        v_splitter.addWidget(self.log_display)
-
-        # 创建日志缓冲区
-        self.log_buffer = LogBuffer(self.log_display, max_lines=2000, update_interval=100)
+        # 下部日志显示（环形缓冲模型，只渲染可见行）
+        self.log_view = LogView(capacity=1_000_000, update_interval=100)
+        v_splitter.addWidget(self.log_view)
 
         # 创建底部按钮布局
         bottom_layout = QHBoxLayout()
@@ -266,33 +234,14 @@ class TestRunnerView(QMainWindow):
         select_action = menu.addAction("选择")
         deselect_action = menu.addAction("取消选择")
 
-        action = menu.exec_(self.tree_widget.mapToGlobal(position))
-
-        if action == select_action:
-            items = self.tree_widget.selectedItems()
-            for item in items:
-                item.setCheckState(0, Qt.Checked)
-        elif action == deselect_action:
-            items = self.tree_widget.selectedItems()
-            for item in items:
-                item.setCheckState(0, Qt.Unchecked)
-
-    def show_log_context_menu(self, position):
-        """显示日志控件的上下文菜单"""
-        menu = QMenu()
+        action = menu.exec_(self.tree_view.mapToGlobal(position))
 
-        clear_action = menu.addAction("清除")
-        toggle_scroll_action = menu.addAction("切换自动滚动")
-
-        action = menu.exec_(self.log_display.mapToGlobal(position))
-
-        if action == clear_action:
-            self.log_display.clear()
-        elif action == toggle_scroll_action:
-            self.toggle_auto_scroll()
+        if action in (select_action, deselect_action):
+            indexes = self.tree_view.selectionModel().selectedRows(0)
+            self.tree_view.model().set_checked(indexes, action == select_action)
 
     def toggle_auto_scroll(self):
-        is_auto_scroll = self.log_buffer.toggle_auto_scroll()
+        is_auto_scroll = self.log_view.toggle_auto_scroll()
         self.auto_scroll_btn.setText(f"自动滚动: {'开' if is_auto_scroll else '关'}")
 
     def show_about(self):
@@ -305,51 +254,71 @@ class TestRunnerView(QMainWindow):
         )
         QMessageBox.about(self, title, content)
 
-    def load_case_structure(self, case_structure):
-        self.tree_widget.clear()
-        for module, case_names in case_structure.items():
-            module_item = QTreeWidgetItem(self.tree_widget)
-            module_item.setText(0, module)
-            module_item.setFlags(module_item.flags() | Qt.ItemIsUserCheckable | Qt.ItemIsAutoTristate)
-            module_item.setCheckState(0, Qt.Unchecked)
-
-            for case_name in case_names:
-                case_item = QTreeWidgetItem(module_item)
-                case_item.setText(0, case_name)
-                case_item.setFlags(case_item.flags() | Qt.ItemIsUserCheckable)
-                case_item.setCheckState(0, Qt.Unchecked)
-
-        self.tree_widget.expandAll()
-
-    def select_all_items(self):
-        root = self.tree_widget.invisibleRootItem()
-        for i in range(root.childCount()):
-            module_item = root.child(i)
-            module_item.setCheckState(0, Qt.Checked)
-
-    def deselect_all_items(self):
-        root = self.tree_widget.invisibleRootItem()
-        for i in range(root.childCount()):
-            module_item = root.child(i)
-            module_item.setCheckState(0, Qt.Unchecked)
+    def set_case_model(self, case_model):
+        """设置用例树模型"""
+        self.tree_view.setModel(case_model)
+        self.tree_view.setColumnWidth(0, 300)
+        case_model.modelAboutToBeReset.connect(self._save_expanded)
+        case_model.modelReset.connect(self._restore_expanded)
+
+    def apply_case_filter(self):
+        model = self.tree_view.model()
+        if model is not None:
+            model.set_filter(self.filter_edit.text())
+
+    def _save_expanded(self):
+        model = self.tree_view.model()
+        self._expanded_modules = {
+            model.index(row, 0).data() for row in range(model.rowCount())
+            if self.tree_view.isExpanded(model.index(row, 0))
+        }
+
+    def _restore_expanded(self):
+        """模型重建后恢复展开状态；过滤时展开全部匹配的模块（展开时才加载子行）"""
+        model = self.tree_view.model()
+        expanded = getattr(self, '_expanded_modules', set())
+        for row in range(model.rowCount()):
+            index = model.index(row, 0)
+            if model.is_filtered() or index.data() in expanded:
+                self.tree_view.expand(index)
+
+    def set_running(self, running):
+        """切换执行中/空闲状态下按钮的可用性"""
+        self.run_btn.setEnabled(not running)
+        self.stop_btn.setEnabled(running)
+        self.kill_btn.setEnabled(running)
+        if running:
+            self.progress_bar.reset()
+            self.progress_label.clear()
+
+    def update_progress(self, progress):
+        """显示执行进度，progress为progress事件 {done, total, passed, failed, skipped, eta}"""
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setRange(0, max(progress['total'], 1))
+        self.progress_bar.setValue(progress['done'])
+        text = f"通过 {progress['passed']}  失败 {progress['failed']}"
+        if progress['skipped']:
+            text += f"  跳过 {progress['skipped']}"
+        if progress['done'] < progress['total']:
+            text += f"  预计剩余 {format_duration(progress['eta'])}"
+        self.progress_label.setText(text)
 
     def update_status(self, message):
         self.status_display.appendPlainText(message)
         self.status_display.moveCursor(QTextCursor.End)
 
     def append_log(self, message):
-        if self.log_buffer:
-            self.log_buffer.append(message)
-        else:
-            # 如果缓冲区未初始化，直接添加到日志显示
-            self.log_display.appendPlainText(message)
-            self.log_display.moveCursor(QTextCursor.End)
+        self.log_view.append(message)
+
+    def append_log_batch(self, records):
+        """追加一批日志 [(级别, 文本)]"""
+        self.log_view.append_records(records)
 
     def clear_status(self):
         self.status_display.clear()
 
     def clear_log(self):
-        self.log_display.clear()
+        self.log_view.clear()
 
     def show_warning(self, title, message):
         QMessageBox.warning(self, title, message)
@@ -366,8 +335,7 @@ class TestRunnerView(QMainWindow):
     def closeEvent(self, event):
         """关闭窗口时的事件处理"""
         # 刷新日志缓冲区
-        if self.log_buffer:
-            self.log_buffer.flush()
+        self.log_view.flush()
         event.accept()
 
     def open_allure_report(self):
@@ -1,13 +1,19 @@
 import sys
-import pytest
+from utils.startup_profile import StartupProfile
+
+# 需在其余导入之前创建，才能统计本文件的导入耗时
+startup = StartupProfile(enabled="--startup-profile" in sys.argv)
+
 import logging
 import argparse
+import os
+import shutil
 import subprocess
-from PyQt5.QtWidgets import QApplication
-from gui.test_runner_controller import TestRunnerController
-from utils.data_loader import load_independent_cases
-from utils.logger_config import configure_logger
-from tests import test_suite
+from utils.logger_config import add_log_handler, configure_logger, flush_logging, remove_log_handler
+
+startup.mark("run.py 导入")
+
+RESULTS_DIR = "temps"  # 与pytest.ini中的--alluredir一致
 
 def setup_logging(log_level=logging.DEBUG):
     """设置日志系统"""
@@ -21,29 +27,109 @@ def parse_arguments():
     parser = argparse.ArgumentParser(description='TLV 自动化测试工具')
     parser.add_argument('--cli', action='store_true', help='在命令行模式下运行')
     parser.add_argument('--no-report', action='store_true', help='不生成报告')
+    parser.add_argument('--app-mode', choices=['fresh', 'pool'], default=None,
+                        help='应用实例模式: fresh 每个用例全新启动, pool 复用应用实例')
+    parser.add_argument('--screenshot-policy', choices=['always', 'on_failure', 'on_change'], default=None,
+                        help='截图策略: always 每次保存, on_failure 仅失败时保存, on_change 画面变化时保存')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='并行worker进程数，每个worker独占一个TLV实例（仅命令行模式）')
+    parser.add_argument('--startup-profile', action='store_true',
+                        help='输出启动阶段各步骤耗时和导入的模块')
+    parser.add_argument('--order', choices=['auto', 'none', 'fail-first', 'duration'], default=None,
+                        help='用例顺序: fail-first 最近失败/不稳定的优先, duration 耗时长的优先, '
+                             'auto 并行时按耗时（默认取 settings.yaml）')
+    parser.add_argument('--changed', action='store_true',
+                        help='只执行用例、配置或TLV程序在上次通过后有变化的用例，其余复用上次结果')
+    parser.add_argument('--failed', action='store_true',
+                        help='只执行上次未通过的用例，其余复用上次结果（可与--changed同时使用）')
+    parser.add_argument('--case-list', default=None,
+                        help='只执行文件中列出的用例（每行一个相对用例目录的路径）')
+    parser.add_argument('--event-stream', action='store_true',
+                        help='在标准输出上输出JSON行格式的执行事件，其余输出改写到标准错误（供GUI子进程使用）')
 
     return parser.parse_args()
 
+def read_case_list(path):
+    """读取--case-list文件，未指定时返回None（全部用例）"""
+    if not path:
+        return None
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
 def run_tests(args):
     """运行测试"""
-    # 设置 CASES 变量
-    test_suite.CASES.clear()
-    test_suite.CASES.extend(load_independent_cases())
+    if args.workers > 1:
+        return run_parallel_tests(args)
+
+    import pytest
+    from utils.case_collector import CaseCollector, collect_case_refs
+    from utils.event_stream import EventStreamPlugin, get_event_stream
+    from utils.incremental import IncrementalRun
+    from utils.scheduler import resolve_order
+    startup.mark("导入pytest")
+    report_startup()
+
+    refs = collect_case_refs(read_case_list(args.case_list))
+    incremental = IncrementalRun([ref.path for ref in refs], args.changed, args.failed)
+
+    if incremental.run:
+        # 运行测试，使用 pytest.ini 中的配置；用例由插件按索引逐个加载
+        logging.info("运行测试: pytest")
+
+        pytest_args = []
+        if args.app_mode:
+            pytest_args.append(f"--app-mode={args.app_mode}")
+        if args.screenshot_policy:
+            pytest_args.append(f"--screenshot-policy={args.screenshot_policy}")
+        plugins = [CaseCollector(incremental.run, order=resolve_order(args.order))]
+        if get_event_stream() is not None:
+            plugins.append(EventStreamPlugin(get_event_stream()))
+        pytest_result = pytest.main(pytest_args, plugins=plugins)
+
+        if pytest_result != 0:
+            logging.warning(f"测试执行完成，但存在失败的测试，返回码: {pytest_result}")
+    else:
+        logging.info("没有需要执行的用例，全部复用上次结果")
+        clean_results_dir()
+        pytest_result = 0
+    incremental.finish(RESULTS_DIR)
+
+    # 生成报告
+    if not args.no_report:
+        generate_report()
 
-    # 运行测试，使用 pytest.ini 中的配置
-    logging.info("运行测试: pytest")
+    return pytest_result
 
-    pytest_result = pytest.main([])
+def run_parallel_tests(args):
+    """多进程并行运行测试"""
+    from utils.case_collector import collect_case_refs
+    from utils.incremental import IncrementalRun
+    from utils.parallel_runner import ParallelRunner
+    from utils.scheduler import schedule_cases
+    startup.mark("导入并行执行器")
+    report_startup()
+
+    extra_args = [f"--screenshot-policy={args.screenshot_policy}"] if args.screenshot_policy else []
+    logging.info(f"并行运行测试: {args.workers} 个worker")
+    refs = collect_case_refs(read_case_list(args.case_list))
+    incremental = IncrementalRun([ref.path for ref in refs], args.changed, args.failed)
+    schedule = schedule_cases(incremental.run, args.order, workers=args.workers)
+    pytest_result = ParallelRunner(args.workers, extra_args).run(schedule.paths, schedule)
+    incremental.finish(RESULTS_DIR)
 
     if pytest_result != 0:
-        logging.warning(f"测试执行完成，但存在失败的测试，返回码: {pytest_result}")
+        logging.warning(f"并行测试执行完成，但存在失败的测试，返回码: {pytest_result}")
 
-    # 生成报告
     if not args.no_report:
         generate_report()
 
     return pytest_result
 
+def clean_results_dir():
+    """清空Allure结果目录（等价于--clean-alluredir）"""
+    shutil.rmtree(RESULTS_DIR, ignore_errors=True)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+
 def generate_report():
     """生成测试报告"""
     logging.info("生成测试报告")
@@ -68,17 +154,39 @@ def generate_report():
 def run_gui_mode():
     """运行GUI模式"""
     logging.info("以GUI模式运行")
+    from PyQt5.QtWidgets import QApplication
+    from gui.test_runner_controller import TestRunnerController
+    startup.mark("导入GUI")
     app = QApplication(sys.argv)
     controller = TestRunnerController()
     controller.view.show()
+    startup.mark("创建窗口")
+    report_startup()
     return app.exec_()
 
+def report_startup():
+    """--startup-profile 时输出启动耗时报告"""
+    if startup.enabled:
+        logging.info(startup.report())
+
 def main():
     """主函数"""
     args = parse_arguments()
+    startup.mark("解析参数")
+
+    # 事件流模式下标准输出只用于事件，需在配置日志（控制台处理器绑定stdout）之前切换
+    stream = event_handler = None
+    if args.event_stream:
+        from utils.event_stream import open_event_stream
+        stream = open_event_stream()
 
     # 设置日志级别
     setup_logging()
+    if stream is not None:
+        from utils.event_stream import EventLogHandler
+        event_handler = EventLogHandler(stream)
+        add_log_handler(event_handler)
+    startup.mark("配置日志")
 
     try:
         if args.cli:
@@ -93,6 +201,12 @@ def main():
     except Exception as e:
         logging.error(f"运行时出错: {str(e)}", exc_info=True)
         sys.exit(1)
+    finally:
+        if event_handler is not None:
+            # 退出前把剩余日志发送给父进程
+            flush_logging()
+            remove_log_handler(event_handler)
+            event_handler.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,30 +1,133 @@
+import logging
 import shutil
 import time
 from pathlib import Path
 import pytest
-from core.tlv_app import TLVApp
-from utils.logger_config import default_logger as logger, default_allure_handler as allure_handler
+from utils.case_collector import CaseCollector
+from utils.case_repository import get_repository
+from utils.data_loader import read_yaml
+from utils.progress import ProgressPlugin
+from utils.logger_config import AllureLogHandler, flush_logging, get_log_handlers, get_logger
+from utils.screenshot import flush_screenshots, get_screenshot_recorder, shutdown_screenshots
+from utils.worker_context import get_worker_id, output_dir
+
+logger = get_logger()
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--app-mode", choices=("fresh", "pool"), default=None,
+        help="应用实例模式: fresh 每个用例全新启动, pool 复用应用实例（默认取 settings.yaml）"
+    )
+    parser.addoption(
+        "--keep-app-pool", action="store_true", default=False,
+        help="会话结束时保留进程级应用池（并行worker使用）"
+    )
+    parser.addoption(
+        "--screenshot-policy", choices=("always", "on_failure", "on_change"), default=None,
+        help="截图策略: always 每次保存, on_failure 仅失败时保存最近N帧, on_change 画面变化时保存"
+    )
+
+
+def pytest_configure(config):
+    """未通过pytest.main(plugins=...)指定用例选择时，默认执行全部用例；记录耗时历史并输出进度"""
+    if _case_collector(config) is None:
+        config.pluginmanager.register(CaseCollector(), "tlv_case_collector")
+    config.pluginmanager.register(ProgressPlugin(), "tlv_progress")
+
+
+def _case_collector(config):
+    for plugin in config.pluginmanager.get_plugins():
+        if isinstance(plugin, CaseCollector):
+            return plugin
+    return None
+
+
+@pytest.fixture
+def case(request):
+    """用例执行计划在执行前才加载（已在收集阶段编译并缓存），执行结束后释放引用"""
+    collector = _case_collector(request.config)
+    yield get_repository(collector.root).load_plan(request.param.path)
 
 
 @pytest.fixture(scope="session", autouse=True)
 def init_logger():
     logger.info("===== 测试会话开始 =====")
+    yield
+    from core.control_registry import get_registry_stats
+    from core.wait_strategy import get_wait_stats
+    logger.info(f"控件等待统计: {get_wait_stats().summary()}")
+    logger.info(f"控件缓存统计: {get_registry_stats().summary()}")
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """记录各阶段结果，供teardown判断用例是否失败"""
+    outcome = yield
+    report = outcome.get_result()
+    setattr(item, f"rep_{report.when}", report)
+
+def pytest_runtest_setup(item):
+    """用例开始时才捕获日志，会话初始化的日志不会混入第一个用例的附件"""
+    flush_logging()
+    for handler in get_log_handlers(AllureLogHandler):
+        handler.start_capture()
 
+@pytest.hookimpl(hookwrapper=True)
 def pytest_runtest_teardown(item, nextitem):
-    """在每个测试用例结束后刷新日志"""
-    allure_handler.flush()
+    """用例结束：先提交截图，fixture清理完成后再附加本用例的日志"""
+    failed = any(getattr(getattr(item, f"rep_{when}", None), "failed", False) for when in ("setup", "call"))
+    flush_screenshots(failed)
+    yield
+    flush_logging()
+    for handler in get_log_handlers(AllureLogHandler):
+        handler.attach()
 
 @pytest.fixture(scope="session", autouse=True)
 def clean_global_screenshots():
-    """全局截图目录清理（整个测试运行只执行一次）"""
-    base_dir = Path("logs/screenshots")
+    """全局截图目录清理（整个测试运行只执行一次；并行worker逐个用例启动会话，由worker启动时清理）"""
+    if get_worker_id() is not None:
+        return
+    base_dir = output_dir("logs/screenshots")
     if base_dir.exists():
         shutil.rmtree(base_dir)
     base_dir.mkdir(parents=True, exist_ok=True)
 
+@pytest.fixture(scope="session", autouse=True)
+def screenshot_recorder(request):
+    """截图服务（会话结束时等待后台编码完成并释放线程池）"""
+    yield get_screenshot_recorder(request.config.getoption("--screenshot-policy"))
+    shutdown_screenshots()
+
+@pytest.fixture(scope="session")
+def app_pool(request):
+    """应用实例池fixture（仅pool模式下创建）"""
+    from core.app_pool import TLVAppPool, get_shared_pool  # pywinauto在真正需要应用时才导入
+    pool_config = read_yaml("configs/settings.yaml").get('app_pool', {})
+    mode = request.config.getoption("--app-mode") or pool_config.get('mode', 'fresh')
+    if mode != "pool":
+        yield None
+        return
+    pool_kwargs = dict(
+        control_name=pool_config.get('control', "TLV Control"),
+        max_size=pool_config.get('size', 1)
+    )
+    if request.config.getoption("--keep-app-pool"):
+        yield get_shared_pool(**pool_kwargs)
+        return
+    pool = TLVAppPool(**pool_kwargs)
+    yield pool
+    pool.shutdown()
+
 @pytest.fixture(scope="function")
-def app():
+def app(app_pool):
     """应用实例fixture"""
+    if app_pool is not None:
+        app = app_pool.acquire()
+        yield app
+        app_pool.release(app)
+        return
+
+    from core.tlv_app import TLVApp
     app = TLVApp()
     app.insert_control("TLV Control")
     # app.resize_window()
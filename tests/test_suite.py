@@ -1,73 +1,82 @@
-import pytest
 import allure
-from utils.data_loader import load_independent_cases
-from utils.screenshot import take_screenshot
+from pathlib import Path
+from utils.duration_history import timed_step
+from utils.event_stream import emit_event
+from utils.prefix_planner import PrefixSession
+from utils.screenshot import step_screenshots, take_screenshot
 
-# 模块级别的CASES变量
-CASES = []
-
-def setup_module(module):
-    """模块级别的设置，在所有测试开始前运行一次"""
-    global CASES
-    if not CASES:
-        CASES.extend(load_independent_cases())
 
 @allure.feature("TLV独立用例测试套件")
 class TestTLVSuite:
 
-    @pytest.mark.parametrize("case", CASES, ids=lambda c: f"{c.get('_meta', {}).get('path', 'unknown')}::{c.get('id', 'unknown')}" if isinstance(c, dict) else str(c))
-    @allure.title("独立用例 - {case[id]}")  # 动态设置用例标题
+    # case 由 CaseCollector 插件按用例索引参数化，执行前由 case fixture 加载编译好的执行计划
+    @allure.title("独立用例 - {case.id}")  # 动态设置用例标题
     @allure.story("核心业务流程验证")
     def test_case(self, app, method_window, case):
         """独立用例执行器（集成Allure报告）"""
         # 添加用例元数据
-        allure.dynamic.description(f"用例路径: {case['_meta']['path']}\n用例描述: {case.get('description', '')}")
-        allure.dynamic.tag(case.get('category', '未分类'))
+        allure.dynamic.description(case.description_text)
+        allure.dynamic.tag(case.category)
+        allure.dynamic.label("case_path", Path(case.path).as_posix())  # 增量执行按此存档和复用结果
+
+        # 同一应用实例上已由前面的用例执行过的幂等前缀步骤不再重复执行
+        prefix = PrefixSession(app, case)
+        for step in case.steps:
+            origin = prefix.origin(step)
+            if origin is not None:
+                with allure.step(f"{step.title}（复用 {origin} 的执行结果）"):
+                    allure.attach(
+                        f"该幂等步骤已在当前应用实例上由用例 {origin} 执行并通过验证，本用例未重复执行\n{step.params_text}",
+                        name="复用前置步骤",
+                        attachment_type=allure.attachment_type.TEXT
+                    )
+                emit_event("step_finished", case_id=case.id, path=Path(case.path).as_posix(), index=step.index,
+                           method=step.method, status="reused", duration=0.0, origin=origin)
+                continue
 
-        for step_idx, step in enumerate(case['steps']):
-            step_title = f"步骤 {step_idx + 1}: {step['method']}"
-            with allure.step(step_title):
+            with timed_step(case, step), allure.step(step.title):
                 # 执行方法调用
                 if not method_window.get_state():
                     app.main_page.open_method_window()
-                method_window.invoke_method(step['method'], step.get('params', []))
+                method_window.invoke_method(step.method, step.params)
 
                 # 添加参数详情
-                params_str = ", ".join(map(str, step.get('params', [])))
                 allure.attach(
                     name="调用参数",
-                    body=f"Method: {step['method']}\nParams: [{params_str}]",
+                    body=step.params_text,
                     attachment_type=allure.attachment_type.TEXT
                 )
 
                 # 执行验证
                 with allure.step("✓ 验证结果"):
-                    for validation in step['validations']:
-                        actual = method_window.get_property(validation['property'])
-                        expected = validation['expected']
+                    for validation in step.validations:
+                        actual = method_window.get_property(validation.property)
 
                         # 添加断言上下文
-                        with allure.step(f"验证属性 {validation['property']}"):
+                        with allure.step(validation.title), step_screenshots():
                             allure.attach(
-                                f"预期值: {expected}\n实际值: {actual}",
+                                validation.detail(actual),
                                 name="验证详情",
                                 attachment_type=allure.attachment_type.TEXT
                             )
                             # 断言前截图
                             take_screenshot(
                                 method_window.window,
-                                suffix=f"{case['id']}_step{step_idx}_validation"
-                            )
-                            assert str(actual) == str(expected), (
-                                f"属性验证失败: {validation['property']}\n"
-                                f"预期: {expected}\n实际: {actual}"
+                                suffix=step.validation_shot
                             )
+                            passed = validation.check(actual)
+                            emit_event("validation", case_id=case.id, step=step.index,
+                                       property=validation.property, expected=validation.expected_text,
+                                       actual=str(actual), passed=passed)
+                            assert passed, validation.failure_message(actual)
 
                     # 条件关闭处理
-                    if step.get('close_after', False):
-                        with allure.step("验证画面变动"):
+                    if step.close_after:
+                        with allure.step("验证画面变动"), step_screenshots():
                             method_window.close_method()
                             take_screenshot(
                                 app.main_window,
-                                suffix=f"{case['id']}_{step_idx}_xdg"
+                                suffix=step.close_shot
                             )
+
+        prefix.finish()
@@ -0,0 +1,74 @@
+"""
+日志开销基准：对比 sync / async 两种模式下，每个UI操作的日志调用在调用线程上的耗时
+
+用法: python tools/bench_logging.py [--actions 5000] [--records-per-action 3]
+控制台输出重定向到临时文件，避免终端刷新速度影响结果
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.chdir(Path(__file__).resolve().parent.parent)
+
+from utils.logger_config import AllureLogHandler, configure_logger, flush_logging, get_log_handlers, shutdown_logging
+
+
+def _run(mode, actions, records_per_action, log_dir):
+    configure_logger(log_dir=log_dir, log_file=f"bench_{mode}.log", mode=mode)
+    for handler in get_log_handlers(AllureLogHandler):
+        handler.start_capture()
+    logger = logging.getLogger("core.pages.method_window_page")
+
+    samples = []
+    for i in range(actions):
+        start = time.perf_counter()
+        for j in range(records_per_action):
+            logger.info("选择方法: %s (第 %d 次, 记录 %d)", "SetProperty", i, j)
+        samples.append(time.perf_counter() - start)
+
+    drain_start = time.perf_counter()
+    flush_logging()
+    drain = time.perf_counter() - drain_start
+    for handler in get_log_handlers(AllureLogHandler):
+        handler.start_capture()  # 丢弃捕获内容，不附加到报告
+    shutdown_logging()
+
+    samples.sort()
+    return {
+        "mean": statistics.mean(samples) * 1e6,
+        "p50": samples[len(samples) // 2] * 1e6,
+        "p99": samples[int(len(samples) * 0.99)] * 1e6,
+        "drain": drain * 1e3,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="日志开销基准")
+    parser.add_argument("--actions", type=int, default=5000, help="模拟的UI操作次数")
+    parser.add_argument("--records-per-action", type=int, default=3, help="每个操作的日志条数")
+    args = parser.parse_args()
+
+    stdout = sys.stdout
+    results = {}
+    with tempfile.TemporaryDirectory() as log_dir, open(os.path.join(log_dir, "console.txt"), "w") as console:
+        sys.stdout = console
+        try:
+            for mode in ("sync", "async"):
+                results[mode] = _run(mode, args.actions, args.records_per_action, log_dir)
+        finally:
+            sys.stdout = stdout
+
+    print(f"{args.actions} 次操作, 每次 {args.records_per_action} 条日志（调用线程耗时, 微秒/操作）")
+    print(f"{'模式':<8}{'平均':>10}{'P50':>10}{'P99':>10}{'排空(ms)':>12}")
+    for mode, r in results.items():
+        print(f"{mode:<8}{r['mean']:>10.1f}{r['p50']:>10.1f}{r['p99']:>10.1f}{r['drain']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
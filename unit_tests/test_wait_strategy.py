@@ -0,0 +1,147 @@
+"""
+等待引擎单元测试（模拟控件与模拟时钟，不依赖TLV和pywinauto）
+不在pytest.ini的testpaths中，TLV用例执行时不会收集；单独运行:
+    python -m unittest discover -s unit_tests -t .
+"""
+import threading
+import unittest
+from core.wait_strategy import EventSource, SmartWait, WaitStats, probe_ready
+
+
+class FakeClock:
+    """模拟时钟：等待时直接推进时间，有事件时立即返回"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.waits = []
+
+    def __call__(self):
+        return self.now
+
+    def wait_signal(self, signal: threading.Event, timeout):
+        if signal.is_set():
+            self.waits.append(0.0)
+            return True
+        self.waits.append(timeout)
+        self.now += timeout
+        return False
+
+
+class FakeControl:
+    """模拟控件（已是包装对象）：到ready_at之后可见且可用，记录每次探测的时间"""
+
+    def __init__(self, clock, ready_at=None, on_probe=None):
+        self.clock = clock
+        self.ready_at = ready_at
+        self.on_probe = on_probe
+        self.probes = []
+
+    def is_visible(self):
+        self.probes.append(self.clock())
+        ready = self.ready_at is not None and self.clock() >= self.ready_at
+        if self.on_probe is not None:
+            self.on_probe(self)
+        return ready
+
+    def is_enabled(self):
+        return True
+
+
+def make_wait(clock, **kwargs):
+    return SmartWait(clock=clock, wait_signal=clock.wait_signal, **kwargs)
+
+
+class SmartWaitTest(unittest.TestCase):
+
+    def test_backoff_interval_grows_to_max(self):
+        clock = FakeClock()
+        wait = make_wait(clock, base_timeout=0.5, base_interval=0.08, initial_interval=0.01, backoff=2.0)
+        with self.assertRaises(TimeoutError):
+            wait.until_element_ready(FakeControl(clock))
+        # 0.01、0.02、0.04后封顶0.08，最后一次截断到剩余时间
+        self.assertEqual(clock.waits[:5], [0.01, 0.02, 0.04, 0.08, 0.08])
+        self.assertAlmostEqual(sum(clock.waits), 0.5)
+        self.assertTrue(all(w <= 0.08 for w in clock.waits))
+
+    def test_ready_returns_at_first_probe_after_ready(self):
+        clock = FakeClock()
+        control = FakeControl(clock, ready_at=0.05)
+        wait = make_wait(clock, base_timeout=2.0, base_interval=0.04, initial_interval=0.01)
+        self.assertTrue(wait.until_element_ready(control))
+        # 探测时刻 0, 0.01, 0.03, 0.07
+        self.assertAlmostEqual(control.probes[-1], 0.07)
+        self.assertEqual(len(control.probes), 4)
+        self.assertEqual((wait.stats.count, wait.stats.timeouts), (1, 0))
+
+    def test_timeout_raises_at_deadline(self):
+        clock = FakeClock()
+        wait = make_wait(clock, base_timeout=0.2, base_interval=0.05, initial_interval=0.01)
+        control = FakeControl(clock)
+        with self.assertRaises(TimeoutError):
+            wait.until_element_ready(control)
+        self.assertAlmostEqual(clock.now, 0.2)
+        self.assertAlmostEqual(control.probes[-1], 0.2)
+        self.assertEqual(wait.stats.timeouts, 1)
+        self.assertAlmostEqual(wait.stats.last_time, 0.2)
+
+    def test_event_wakes_wait_before_poll_interval(self):
+        clock = FakeClock()
+        source = EventSource()
+
+        def ready_with_event(control):
+            # 第一次探测（未就绪）之后控件就绪并产生事件
+            if len(control.probes) == 1:
+                control.ready_at = clock()
+                source.notify()
+
+        control = FakeControl(clock, on_probe=ready_with_event)
+        wait = make_wait(clock, base_timeout=5.0, base_interval=3.0, initial_interval=3.0, event_source=source)
+        # 轮询间隔3秒，事件使等待立即返回并重新探测
+        self.assertTrue(wait.until_element_ready(control))
+        self.assertEqual(clock.waits, [0.0])
+        self.assertEqual(len(control.probes), 2)
+        self.assertEqual(clock.now, 0.0)
+        self.assertFalse(source._listeners)
+
+    def test_global_and_instance_stats(self):
+        from core.wait_strategy import get_wait_stats
+        clock = FakeClock()
+        before = get_wait_stats().count
+        wait = make_wait(clock, base_timeout=0.1, base_interval=0.05, initial_interval=0.05)
+        wait.until_element_ready(FakeControl(clock, ready_at=0.0))
+        with self.assertRaises(TimeoutError):
+            wait.until_element_ready(FakeControl(clock))
+        self.assertEqual((wait.stats.count, wait.stats.timeouts), (2, 1))
+        self.assertAlmostEqual(wait.stats.max_time, 0.1)
+        self.assertEqual(get_wait_stats().count, before + 2)
+
+
+class WaitStatsTest(unittest.TestCase):
+
+    def test_summary(self):
+        stats = WaitStats()
+        stats.record(0.1)
+        stats.record(0.3, ready=False)
+        self.assertEqual((stats.count, stats.timeouts), (2, 1))
+        self.assertAlmostEqual(stats.total_time, 0.4)
+        self.assertAlmostEqual(stats.max_time, 0.3)
+        self.assertIn("等待 2 次, 超时 1 次", stats.summary())
+
+
+class ProbeReadyTest(unittest.TestCase):
+
+    def test_wrapper_probe(self):
+        clock = FakeClock()
+        self.assertTrue(probe_ready(FakeControl(clock, ready_at=0.0)))
+        self.assertFalse(probe_ready(FakeControl(clock)))
+
+    def test_probe_errors_are_not_ready(self):
+        class Broken:
+            def is_visible(self):
+                raise RuntimeError("element is gone")
+
+        self.assertFalse(probe_ready(Broken()))
+
+
+if __name__ == "__main__":
+    unittest.main()
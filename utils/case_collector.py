@@ -0,0 +1,116 @@
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+import pytest
+from utils.case_plan import CaseSchemaError
+from utils.case_repository import get_repository
+
+logger = logging.getLogger("utils.case_collector")
+
+
+class CaseRef(NamedTuple):
+    """用例引用：只包含索引中的路径和ID，不含用例内容"""
+    path: str  # 相对用例根目录的posix路径
+    id: str
+    module: str
+    name: str
+
+    @property
+    def node_id(self) -> str:
+        return f"{Path(self.path)}::{self.id}"
+
+
+def collect_case_refs(paths: Optional[Iterable[str]] = None, root="tests/cases") -> List[CaseRef]:
+    """从用例索引生成引用列表，paths为None时返回全部用例"""
+    repository = get_repository(root)
+    repository.refresh()
+    entries = repository.entries()
+    if paths is None:
+        selected = entries.keys()
+    else:
+        selected = [Path(path).as_posix() for path in paths]
+    refs = []
+    for path in selected:
+        entry = entries.get(path)
+        if entry is None:
+            continue
+        refs.append(CaseRef(path, entry['id'] or entry['name'], entry['module'], entry['name']))
+    return refs
+
+
+class CaseCollector:
+    """
+    pytest插件：按索引中的ID和路径生成用例项，用例内容由case fixture在执行前加载
+    收集阶段完成结构校验与编译，结构错误的用例在fixture之前直接失败
+    """
+
+    def __init__(self, paths: Optional[Iterable[str]] = None, root="tests/cases", order: Optional[str] = None):
+        """
+        :param paths: 要执行的用例相对路径，None表示全部
+        :param root: 用例根目录
+        :param order: 按历史记录排序的方式（见utils.scheduler），None表示保持索引顺序且不写执行元数据
+        """
+        self.paths = list(paths) if paths is not None else None
+        self.root = root
+        self.order = order
+        self.schedule = None
+        self.schema_errors = {}
+
+    @classmethod
+    def from_selection(cls, selected_cases: Dict[str, List[str]], root="tests/cases") -> 'CaseCollector':
+        """由GUI的 {模块: [用例名]} 选择结构创建"""
+        paths = [
+            f"{module}/{case_name}.yaml"
+            for module, case_names in selected_cases.items()
+            for case_name in case_names
+        ]
+        return cls(paths, root)
+
+    def pytest_configure(self, config):
+        config.addinivalue_line("markers", "tlv_invalid_case(reason): 用例结构校验失败，不启动应用直接报错")
+
+    def pytest_generate_tests(self, metafunc):
+        if "case" not in metafunc.fixturenames:
+            return
+        repository = get_repository(self.root)
+        params = []
+        self.schema_errors = {}
+        refs = collect_case_refs(self.paths, self.root)
+        if self.order is not None:
+            from utils.scheduler import schedule_cases
+            self.schedule = schedule_cases([ref.path for ref in refs], self.order, load_plan=repository.load_plan)
+            by_path = {ref.path: ref for ref in refs}
+            refs = [by_path[path] for path in self.schedule.paths]
+        for ref in refs:
+            marks = ()
+            try:
+                repository.load_plan(ref.path)  # 编译结果按内容哈希缓存，执行时直接复用
+            except CaseSchemaError as e:
+                self.schema_errors[ref.node_id] = str(e)
+                marks = (pytest.mark.tlv_invalid_case(str(e)),)
+            params.append(pytest.param(ref, id=ref.node_id, marks=marks))
+        metafunc.parametrize("case", params, indirect=True)
+
+    def pytest_collection_finish(self, session):
+        """记录本次执行顺序（在allure清理结果目录之后写入）"""
+        if self.schedule is not None:
+            from utils.scheduler import write_run_metadata
+            write_run_metadata(self.schedule, session.config.getoption("allure_report_dir", None) or "temps")
+
+    def pytest_report_collectionfinish(self, config, items):
+        """在收集阶段汇报结构错误的用例"""
+        errors = self.schema_errors
+        if not errors:
+            return []
+        lines = [f"用例结构错误 ({len(errors)} 个，将不启动应用直接报错):"]
+        for node_id, message in errors.items():
+            logger.error(f"用例结构错误: {message}")
+            lines.append(f"  {node_id}: {message}")
+        return lines
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item):
+        """先于fixture执行，结构错误的用例不会启动应用"""
+        marker = item.get_closest_marker("tlv_invalid_case")
+        if marker is not None:
+            pytest.fail(f"用例结构错误: {marker.args[0]}", pytrace=False)
@@ -0,0 +1,181 @@
+import re
+from typing import Any, Callable, NamedTuple, Tuple
+
+# 编译结果格式变化时递增，使旧的计划缓存失效
+PLAN_VERSION = 2
+
+# MethodWindowPage.get_property 支持的属性
+SUPPORTED_PROPERTIES = ("return_value",)
+
+
+class CaseSchemaError(ValueError):
+    """用例结构不合法"""
+
+    def __init__(self, path, errors):
+        self.path = path
+        self.errors = list(errors)
+        super().__init__(f"{path}: " + "; ".join(self.errors))
+
+
+def _equals(actual, expected):
+    return str(actual) == expected
+
+
+def _not_equals(actual, expected):
+    return str(actual) != expected
+
+
+def _contains(actual, expected):
+    return expected in str(actual)
+
+
+def _regex(actual, expected):
+    return expected.search(str(actual)) is not None
+
+
+# 比较方式: (比较函数, 期望值预处理)
+COMPARATORS = {
+    "equals": (_equals, str),
+    "not_equals": (_not_equals, str),
+    "contains": (_contains, str),
+    "regex": (_regex, re.compile),
+}
+
+
+class ValidationPlan(NamedTuple):
+    property: str
+    expected: Any  # 经预处理的期望值（字符串或已编译正则）
+    expected_text: str
+    compare: Callable
+    title: str
+
+    def check(self, actual) -> bool:
+        return self.compare(actual, self.expected)
+
+    def detail(self, actual) -> str:
+        return f"预期值: {self.expected_text}\n实际值: {actual}"
+
+    def failure_message(self, actual) -> str:
+        return f"属性验证失败: {self.property}\n预期: {self.expected_text}\n实际: {actual}"
+
+
+class StepPlan(NamedTuple):
+    index: int
+    method: str
+    params: Tuple
+    close_after: bool
+    idempotent: bool  # 重复执行效果不变，同一应用实例上已执行过时可复用
+    validations: Tuple[ValidationPlan, ...]
+    title: str
+    params_text: str
+    validation_shot: str  # 断言前截图后缀
+    close_shot: str  # 关闭窗口后截图后缀
+
+    @property
+    def signature(self) -> str:
+        """步骤对应用状态的作用（方法、参数、是否关闭窗口），验证不参与比较"""
+        return repr((self.method, self.params, self.close_after))
+
+
+class CasePlan(NamedTuple):
+    """编译后的不可变用例执行计划"""
+    id: str
+    path: str
+    description: str
+    category: str
+    steps: Tuple[StepPlan, ...]
+    description_text: str
+
+
+def _compile_validation(validation, where, errors):
+    if not isinstance(validation, dict):
+        errors.append(f"{where} 必须是字典")
+        return None
+    prop = validation.get('property')
+    if prop not in SUPPORTED_PROPERTIES:
+        errors.append(f"{where}.property 不支持: {prop!r}（可选: {', '.join(SUPPORTED_PROPERTIES)}）")
+    if 'expected' not in validation:
+        errors.append(f"{where}.expected 缺失")
+    compare_name = validation.get('compare', 'equals')
+    if compare_name not in COMPARATORS:
+        errors.append(f"{where}.compare 不支持: {compare_name!r}（可选: {', '.join(COMPARATORS)}）")
+        return None
+    compare, prepare = COMPARATORS[compare_name]
+    expected_text = str(validation.get('expected'))
+    try:
+        expected = prepare(expected_text)
+    except re.error as e:
+        errors.append(f"{where}.expected 正则表达式无效: {str(e)}")
+        return None
+    return ValidationPlan(prop, expected, expected_text, compare, f"验证属性 {prop}")
+
+
+def _compile_step(case_id, step_idx, step, errors):
+    where = f"steps[{step_idx}]"
+    if not isinstance(step, dict):
+        errors.append(f"{where} 必须是字典")
+        return None
+    method = step.get('method')
+    if not isinstance(method, str) or not method:
+        errors.append(f"{where}.method 缺失或不是字符串")
+    params = step.get('params', [])
+    if not isinstance(params, list):
+        errors.append(f"{where}.params 必须是列表")
+        params = []
+    close_after = step.get('close_after', False)
+    if not isinstance(close_after, bool):
+        errors.append(f"{where}.close_after 必须是布尔值")
+    idempotent = step.get('idempotent', False)
+    if not isinstance(idempotent, bool):
+        errors.append(f"{where}.idempotent 必须是布尔值")
+    validations = step.get('validations')
+    if not isinstance(validations, list):
+        errors.append(f"{where}.validations 缺失或不是列表")
+        validations = []
+    compiled = tuple(
+        _compile_validation(validation, f"{where}.validations[{i}]", errors)
+        for i, validation in enumerate(validations)
+    )
+    params_str = ", ".join(map(str, params))
+    return StepPlan(
+        index=step_idx,
+        method=method,
+        params=tuple(params),
+        close_after=bool(close_after),
+        idempotent=bool(idempotent),
+        validations=compiled,
+        title=f"步骤 {step_idx + 1}: {method}",
+        params_text=f"Method: {method}\nParams: [{params_str}]",
+        validation_shot=f"{case_id}_step{step_idx}_validation",
+        close_shot=f"{case_id}_{step_idx}_xdg",
+    )
+
+
+def compile_case(case_data, path) -> CasePlan:
+    """
+    校验并编译用例
+    :raises CaseSchemaError: 汇总用例中的全部结构错误
+    """
+    if not isinstance(case_data, dict) or not case_data:
+        raise CaseSchemaError(path, ["用例内容为空或不是字典"])
+    errors = []
+    case_id = case_data.get('id')
+    if not isinstance(case_id, str) or not case_id:
+        errors.append("id 缺失或不是字符串")
+    steps = case_data.get('steps')
+    if not isinstance(steps, list) or not steps:
+        errors.append("steps 缺失或为空")
+        steps = []
+    compiled_steps = tuple(_compile_step(case_id, i, step, errors) for i, step in enumerate(steps))
+    if errors:
+        raise CaseSchemaError(path, errors)
+
+    description = case_data.get('description', '')
+    return CasePlan(
+        id=case_id,
+        path=path,
+        description=description,
+        category=case_data.get('category', '未分类'),
+        steps=compiled_steps,
+        description_text=f"用例路径: {path}\n用例描述: {description}",
+    )
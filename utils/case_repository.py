@@ -0,0 +1,232 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+import yaml
+from utils.case_plan import PLAN_VERSION, CasePlan, CaseSchemaError, compile_case
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # 未编译libyaml时回退到纯Python解析器
+    from yaml import SafeLoader
+
+logger = logging.getLogger("utils.case_repository")
+
+PROJECT_ROOT = Path(__file__).parent.parent
+INDEX_VERSION = 1
+
+
+class CaseChanges(NamedTuple):
+    """一次刷新检测到的变化（均为相对用例根目录的posix路径）"""
+    added: List[str]
+    modified: List[str]
+    removed: List[str]
+
+    def __bool__(self):
+        return bool(self.added or self.modified or self.removed)
+
+
+class CaseRepository:
+    """
+    用例仓库：以文件路径、mtime和内容哈希为键维护磁盘索引
+    只有变化的文件会被重新解析，结构查询直接由索引回答
+    """
+
+    def __init__(self, root="tests/cases", cache_dir=None):
+        self.base_path = PROJECT_ROOT / root
+        self.cache_dir = Path(cache_dir) if cache_dir else PROJECT_ROOT / ".cache"
+        index_name = "case_index" if root == "tests/cases" else f"case_index_{hashlib.sha1(root.encode()).hexdigest()[:8]}"
+        self.index_path = self.cache_dir / f"{index_name}.json"
+        self.body_dir = self.cache_dir / "case_bodies"
+        self.plan_dir = self.cache_dir / "case_plans"
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.RLock()
+        self._loaded = False
+
+    def refresh(self) -> CaseChanges:
+        """扫描用例目录，增量更新索引"""
+        with self._lock:
+            if not self._loaded:
+                self._load_index()
+            added, modified = [], []
+            entries = {}
+            touched = False
+            for yaml_file in self.base_path.rglob("*.yaml"):
+                rel_path = yaml_file.relative_to(self.base_path).as_posix()
+                stat = yaml_file.stat()
+                entry = self._entries.get(rel_path)
+                if entry and entry['mtime'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+                    entries[rel_path] = entry
+                    continue
+
+                content = yaml_file.read_bytes()
+                digest = hashlib.sha1(content).hexdigest()
+                if entry and entry['hash'] == digest:
+                    # 仅时间戳变化，内容未变
+                    entry.update(mtime=stat.st_mtime_ns, size=stat.st_size)
+                    entries[rel_path] = entry
+                    touched = True
+                    continue
+
+                entries[rel_path] = self._parse_entry(rel_path, content, digest, stat)
+                (modified if entry else added).append(rel_path)
+
+            removed = [path for path in self._entries if path not in entries]
+            self._prune_bodies(
+                [self._entries[path]['hash'] for path in modified + removed],
+                {entry['hash'] for entry in entries.values()}
+            )
+            self._entries = entries
+            changes = CaseChanges(added, modified, removed)
+            if changes:
+                logger.info(f"用例索引更新: 新增 {len(added)}, 修改 {len(modified)}, 删除 {len(removed)}")
+            if changes or touched:
+                self._save_index()
+            return changes
+
+    def entries(self) -> Dict[str, dict]:
+        """索引条目 {相对路径: 元数据}"""
+        with self._lock:
+            if not self._loaded:
+                self.refresh()
+            return dict(self._entries)
+
+    def get_structure(self) -> Dict[str, List[str]]:
+        """用例模块和用例名称的结构"""
+        structure = {}
+        for entry in self.entries().values():
+            structure.setdefault(entry['module'], []).append(entry['name'])
+        return structure
+
+    def load_case(self, rel_path: str) -> dict:
+        """加载单个用例内容，未变化的文件直接读取解析缓存"""
+        rel_path = Path(rel_path).as_posix()
+        entry = self.entries().get(rel_path)
+        if entry is None:
+            raise FileNotFoundError(f"用例不存在: {rel_path}")
+        body_file = self.body_dir / f"{entry['hash']}.pickle"
+        try:
+            with open(body_file, 'rb') as f:
+                case_data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            content = (self.base_path / rel_path).read_bytes()
+            case_data = yaml.load(content, Loader=SafeLoader)
+            self._store_body(entry['hash'], case_data)
+        case_data['_meta'] = {'path': str(Path(rel_path))}
+        return case_data
+
+    def load_plan(self, rel_path: str) -> CasePlan:
+        """
+        加载用例的编译计划，按内容哈希缓存
+        :raises CaseSchemaError: 用例结构不合法
+        """
+        rel_path = Path(rel_path).as_posix()
+        entry = self.entries().get(rel_path)
+        if entry is None:
+            raise FileNotFoundError(f"用例不存在: {rel_path}")
+        if entry.get('error'):
+            raise CaseSchemaError(str(Path(rel_path)), [entry['error']])
+        plan_file = self.plan_dir / f"{entry['hash']}-v{PLAN_VERSION}.pickle"
+        try:
+            with open(plan_file, 'rb') as f:
+                plan = pickle.load(f)
+            if plan.path == str(Path(rel_path)):
+                return plan
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            pass
+
+        case_data = self.load_case(rel_path)
+        plan = compile_case(case_data, case_data['_meta']['path'])
+        try:
+            self.plan_dir.mkdir(parents=True, exist_ok=True)
+            with open(plan_file, 'wb') as f:
+                pickle.dump(plan, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:
+            logger.warning(f"写入用例计划缓存失败: {str(e)}")
+        return plan
+
+    def load_all(self) -> List[dict]:
+        return [self.load_case(path) for path in self.entries()]
+
+    def load_selected(self, selected_cases: Dict[str, List[str]]) -> List[dict]:
+        return [
+            self.load_case(f"{module}/{case_name}.yaml")
+            for module, case_names in selected_cases.items()
+            for case_name in case_names
+        ]
+
+    def _parse_entry(self, rel_path, content, digest, stat) -> dict:
+        error = None
+        try:
+            case_data = yaml.load(content, Loader=SafeLoader)
+        except yaml.YAMLError as e:
+            logger.warning(f"用例YAML解析失败: {rel_path}: {str(e)}")
+            case_data, error = {}, f"YAML解析失败: {str(e)}"
+        if not isinstance(case_data, dict):
+            case_data = {}
+        self._store_body(digest, case_data)
+        module = Path(rel_path).parent.as_posix()
+        return {
+            'error': error,
+            'mtime': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'hash': digest,
+            'module': module,
+            'name': Path(rel_path).stem,
+            'id': case_data.get('id'),
+            'description': case_data.get('description', ''),
+            'category': case_data.get('category'),
+        }
+
+    def _store_body(self, digest, case_data):
+        try:
+            self.body_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.body_dir / f"{digest}.pickle", 'wb') as f:
+                pickle.dump(case_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:
+            logger.warning(f"写入用例解析缓存失败: {str(e)}")
+
+    def _prune_bodies(self, stale_hashes, live_hashes):
+        """删除不再被任何用例引用的解析缓存"""
+        for digest in set(stale_hashes) - live_hashes:
+            (self.body_dir / f"{digest}.pickle").unlink(missing_ok=True)
+            for plan_file in self.plan_dir.glob(f"{digest}-v*.pickle"):
+                plan_file.unlink(missing_ok=True)
+
+    def _load_index(self):
+        self._loaded = True
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == INDEX_VERSION and data.get('root') == str(self.base_path):
+            self._entries = data.get('entries', {})
+
+    def _save_index(self):
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_path.with_suffix(".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'version': INDEX_VERSION,
+                    'root': str(self.base_path),
+                    'entries': self._entries,
+                }, f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logger.warning(f"保存用例索引失败: {str(e)}")
+
+
+_repositories: Dict[str, CaseRepository] = {}
+
+
+def get_repository(root="tests/cases") -> CaseRepository:
+    """按用例根目录获取共享的仓库实例"""
+    if root not in _repositories:
+        _repositories[root] = CaseRepository(root)
+    return _repositories[root]
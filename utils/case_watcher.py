@@ -0,0 +1,154 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+from typing import Callable, Dict
+from utils.case_repository import CaseChanges, CaseRepository, get_repository
+
+logger = logging.getLogger("utils.case_watcher")
+
+# inotify事件掩码（linux/inotify.h）
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_ISDIR = 0x40000000
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _Inotify:
+    """基于ctypes的inotify封装：递归监视目录，只报告"有变化"，具体变化由索引刷新得出"""
+
+    def __init__(self, root):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        self._dirs = {}  # wd -> 目录
+        self.watch_tree(str(root))
+
+    def watch_tree(self, root):
+        for dir_path, _, _ in os.walk(root):
+            wd = self._add_watch(self.fd, os.fsencode(dir_path), _WATCH_MASK)
+            if wd >= 0:
+                self._dirs[wd] = dir_path
+
+    def wait(self, timeout) -> bool:
+        """等待事件，有事件时读取并返回True（新建的子目录会加入监视）"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return False
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + name_len].rstrip(b"\0")
+            offset += name_len
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and wd in self._dirs:
+                self.watch_tree(os.path.join(self._dirs[wd], os.fsdecode(name)))
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+class CaseWatcher:
+    """
+    用例目录监视器：检测到变化后增量刷新用例索引，并把变化回调给调用方
+    Linux下使用inotify，其余平台（或inotify不可用时）按mtime轮询
+    变化由监视器自己保存的索引快照比较得出，同一进程中其他地方刷新共享仓库也不会漏报
+    回调在监视线程中执行，GUI需自行转发到界面线程
+    """
+
+    def __init__(self, on_change: Callable[[CaseChanges], None], repository: CaseRepository = None,
+                 poll_interval=1.0, settle_time=0.2):
+        """
+        :param on_change: 索引变化时的回调，参数为CaseChanges
+        :param repository: 用例仓库（默认共享仓库）
+        :param poll_interval: 轮询模式的扫描间隔（秒）
+        :param settle_time: inotify模式下事件停止后等待的时间（秒），合并编辑器保存产生的多次事件
+        """
+        self.on_change = on_change
+        self.repository = repository or get_repository()
+        self.poll_interval = poll_interval
+        self.settle_time = settle_time
+        self.mode = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._snapshot: Dict[str, str] = {}  # {相对路径: 内容哈希}，上次回调时的索引
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._snapshot = self._take_snapshot()
+        inotify = None
+        if sys.platform.startswith("linux"):
+            try:
+                inotify = _Inotify(self.repository.base_path)
+            except (OSError, AttributeError) as e:
+                logger.warning(f"inotify不可用，改为轮询: {str(e)}")
+        self.mode = "inotify" if inotify else "poll"
+        target = self._run_inotify if inotify else self._run_poll
+        self._thread = threading.Thread(target=target, args=(inotify,) if inotify else (),
+                                        name="case-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"开始监视用例目录 ({self.mode}): {self.repository.base_path}")
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run_poll(self):
+        # 索引刷新本身只stat文件，mtime/大小变化的文件才会重新解析
+        while not self._stop.wait(self.poll_interval):
+            self._refresh()
+
+    def _run_inotify(self, inotify):
+        try:
+            while not self._stop.is_set():
+                if not inotify.wait(0.5):
+                    continue
+                # 等待事件平息，编辑器保存通常产生多次写入/重命名
+                while not self._stop.is_set() and inotify.wait(self.settle_time):
+                    pass
+                self._refresh()
+        finally:
+            inotify.close()
+
+    def _take_snapshot(self) -> Dict[str, str]:
+        return {path: entry['hash'] for path, entry in self.repository.entries().items()}
+
+    def _refresh(self):
+        try:
+            self.repository.refresh()
+            snapshot = self._take_snapshot()
+        except Exception as e:
+            logger.error(f"刷新用例索引失败: {str(e)}", exc_info=True)
+            return
+        previous, self._snapshot = self._snapshot, snapshot
+        changes = CaseChanges(
+            added=[path for path in snapshot if path not in previous],
+            modified=[path for path in snapshot if path in previous and snapshot[path] != previous[path]],
+            removed=[path for path in previous if path not in snapshot],
+        )
+        if changes:
+            try:
+                self.on_change(changes)
+            except Exception as e:
+                logger.error(f"处理用例变化失败: {str(e)}", exc_info=True)
@@ -0,0 +1,182 @@
+import logging
+import sqlite3
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from utils.event_stream import emit_event
+
+logger = logging.getLogger("utils.duration_history")
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS case_runs (
+    case_path TEXT NOT NULL,
+    case_id TEXT,
+    outcome TEXT NOT NULL,
+    duration REAL NOT NULL,
+    finished_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS case_runs_path ON case_runs (case_path, finished_at);
+CREATE TABLE IF NOT EXISTS step_runs (
+    case_path TEXT NOT NULL,
+    step_index INTEGER NOT NULL,
+    method TEXT,
+    status TEXT NOT NULL,
+    duration REAL NOT NULL,
+    finished_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS step_runs_path ON step_runs (case_path, step_index, finished_at);
+"""
+
+
+class DurationHistory:
+    """
+    用例/步骤耗时历史（.cache/durations.sqlite3）
+    记录先缓存在内存中，每个用例结束时由commit()在一个事务中写入
+    并行worker各自写入同一数据库（WAL模式，写锁等待）
+    """
+
+    def __init__(self, path=None, keep=50):
+        """
+        :param path: 数据库路径，默认 .cache/durations.sqlite3
+        :param keep: 每个用例保留的最近记录数
+        """
+        self.path = Path(path) if path else PROJECT_ROOT / ".cache" / "durations.sqlite3"
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pending_cases = []
+        self._pending_steps = []
+
+    def record_case(self, case_path: str, case_id: str, outcome: str, duration: float):
+        with self._lock:
+            self._pending_cases.append((case_path, case_id, outcome, duration, time.time()))
+
+    def record_step(self, case_path: str, index: int, method: str, status: str, duration: float):
+        with self._lock:
+            self._pending_steps.append((case_path, index, method, status, duration, time.time()))
+
+    def commit(self):
+        """写入缓存的记录，并清理超出保留数量的旧记录"""
+        with self._lock:
+            cases, self._pending_cases = self._pending_cases, []
+            steps, self._pending_steps = self._pending_steps, []
+            if not cases and not steps:
+                return
+            try:
+                conn = self._connect()
+                with conn:
+                    conn.executemany("INSERT INTO case_runs VALUES (?, ?, ?, ?, ?)", cases)
+                    conn.executemany("INSERT INTO step_runs VALUES (?, ?, ?, ?, ?, ?)", steps)
+                    for case_path in {case[0] for case in cases}:
+                        self._prune(conn, case_path)
+            except sqlite3.Error as e:
+                logger.warning(f"写入耗时历史失败: {str(e)}")
+
+    def case_medians(self, case_paths: Optional[Iterable[str]] = None, window=20) -> Dict[str, float]:
+        """
+        各用例最近window次执行（不含跳过）耗时的中位数
+        :param case_paths: 只查询这些用例，None表示全部
+        """
+        history = {}
+        for case_path, duration in self._query(
+                "SELECT case_path, duration FROM case_runs WHERE outcome != 'skipped' "
+                "ORDER BY finished_at DESC"):
+            durations = history.setdefault(case_path, [])
+            if len(durations) < window:
+                durations.append(duration)
+        if case_paths is not None:
+            wanted = set(case_paths)
+            history = {path: durations for path, durations in history.items() if path in wanted}
+        return {path: statistics.median(durations) for path, durations in history.items()}
+
+    def step_medians(self, case_path: str, window=20) -> Dict[int, float]:
+        """用例各步骤最近window次耗时的中位数 {步骤序号: 秒}"""
+        history = {}
+        for index, duration in self._query(
+                "SELECT step_index, duration FROM step_runs WHERE case_path = ? ORDER BY finished_at DESC",
+                (case_path,)):
+            durations = history.setdefault(index, [])
+            if len(durations) < window:
+                durations.append(duration)
+        return {index: statistics.median(durations) for index, durations in history.items()}
+
+    def recent_outcomes(self, case_paths: Optional[Iterable[str]] = None, window=10) -> Dict[str, List[str]]:
+        """各用例最近window次执行结果（由新到旧）"""
+        outcomes = {}
+        for case_path, outcome in self._query(
+                "SELECT case_path, outcome FROM case_runs ORDER BY finished_at DESC"):
+            recent = outcomes.setdefault(case_path, [])
+            if len(recent) < window:
+                recent.append(outcome)
+        if case_paths is not None:
+            wanted = set(case_paths)
+            outcomes = {path: recent for path, recent in outcomes.items() if path in wanted}
+        return outcomes
+
+    def close(self):
+        self.commit()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            if self._conn is None and not self.path.exists():
+                return []
+            try:
+                return self._connect().execute(sql, params).fetchall()
+            except sqlite3.Error as e:
+                logger.warning(f"读取耗时历史失败: {str(e)}")
+                return []
+
+    def _connect(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _prune(self, conn, case_path):
+        cutoff = conn.execute(
+            "SELECT finished_at FROM case_runs WHERE case_path = ? ORDER BY finished_at DESC LIMIT 1 OFFSET ?",
+            (case_path, self.keep)).fetchone()
+        if cutoff:
+            conn.execute("DELETE FROM case_runs WHERE case_path = ? AND finished_at <= ?", (case_path, cutoff[0]))
+            conn.execute("DELETE FROM step_runs WHERE case_path = ? AND finished_at <= ?", (case_path, cutoff[0]))
+
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_history() -> DurationHistory:
+    """进程内共享的耗时历史"""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = DurationHistory()
+        return _history
+
+
+@contextmanager
+def timed_step(case, step):
+    """执行用例步骤：记录耗时并发送step_finished事件（异常时状态为failed）"""
+    case_path = Path(case.path).as_posix()
+    start = time.perf_counter()
+    status = "failed"
+    try:
+        yield
+        status = "passed"
+    finally:
+        duration = time.perf_counter() - start
+        get_history().record_step(case_path, step.index, step.method, status, duration)
+        emit_event("step_finished", case_id=case.id, path=case_path, index=step.index, method=step.method,
+                   status=status, duration=duration)
@@ -0,0 +1,163 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+logger = logging.getLogger("utils.event_stream")
+
+_stream = None
+
+
+class EventStream:
+    """结构化事件输出：每行一个JSON对象，线程安全"""
+
+    def __init__(self, out, commands=None):
+        """
+        :param out: 事件输出
+        :param commands: 父进程命令的输入（每行一条），None表示不接收命令
+        """
+        self.out = out
+        self.commands = commands
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **fields):
+        line = json.dumps({"event": event, "time": time.time(), **fields}, ensure_ascii=False, default=str)
+        with self._lock:
+            try:
+                self.out.write(line + "\n")
+                self.out.flush()
+            except (OSError, ValueError):
+                pass  # 父进程已关闭管道
+
+
+def open_event_stream() -> EventStream:
+    """
+    将事件流绑定到标准输出（需在配置日志之前调用）
+    其余写往标准输出的内容（控制台日志、pytest输出）改写到标准错误，保证管道中只有事件
+    标准输入同样先复制一份用于接收命令，pytest的输出捕获会替换掉原来的标准输入
+    """
+    global _stream
+    sys.stdout.flush()
+    events_out = os.fdopen(os.dup(1), "w", encoding="utf-8", buffering=1)
+    commands = os.fdopen(os.dup(0), "r", encoding="utf-8")
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+    _stream = EventStream(events_out, commands)
+    return _stream
+
+
+def get_event_stream():
+    return _stream
+
+
+def emit_event(event: str, **fields):
+    """发送事件（未开启事件流时不做任何事）"""
+    if _stream is not None:
+        _stream.emit(event, **fields)
+
+
+def summarize_reports(reports):
+    """汇总用例各阶段报告，返回 (结果, 失败/跳过原因, 总耗时)"""
+    failed = next((r for r in reports if r.failed), None)
+    skipped = next((r for r in reports if r.skipped), None)
+    if failed is not None:
+        lines = failed.longreprtext.strip().splitlines()
+        outcome, message = "failed", lines[-1] if lines else ""
+    elif skipped is not None:
+        outcome, message = "skipped", str(skipped.longrepr[-1]) if isinstance(skipped.longrepr, tuple) else ""
+    else:
+        outcome, message = "passed", ""
+    return outcome, message, sum(r.duration for r in reports)
+
+
+class EventLogHandler(logging.Handler):
+    """将日志按时间片合并为log事件: {"event": "log", "records": [[级别, 文本], ...]}"""
+
+    def __init__(self, stream: EventStream, interval=0.1):
+        super().__init__()
+        self.stream = stream
+        self.interval = interval
+        self.setFormatter(logging.Formatter(
+            '%(asctime)s [%(levelname)-8s] %(filename)s:%(lineno)d - %(message)s'
+        ))
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._run, name="event-log-flusher", daemon=True)
+        self._flusher.start()
+
+    def emit(self, record):
+        try:
+            msg = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self._pending_lock:
+            self._pending.append((record.levelno, msg))
+
+    def flush(self):
+        with self._pending_lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            self.stream.emit("log", records=batch)
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+        super().close()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+
+class EventStreamPlugin:
+    """pytest插件：发送用例开始/结束和会话事件，并从标准输入接收停止请求"""
+
+    def __init__(self, stream: EventStream):
+        self.stream = stream
+        self.session = None
+        self._cases = {}  # nodeid -> CaseRef
+        self._reports = {}  # nodeid -> [TestReport]
+
+    def pytest_collection_finish(self, session):
+        self.session = session
+        for item in session.items:
+            callspec = getattr(item, "callspec", None)
+            if callspec is not None and "case" in callspec.params:
+                self._cases[item.nodeid] = callspec.params["case"]
+        self.stream.emit("session_started", total=len(session.items))
+        if self.stream.commands is not None:
+            threading.Thread(target=self._read_commands, name="event-stream-commands", daemon=True).start()
+
+    def pytest_runtest_logstart(self, nodeid, location):
+        self._reports[nodeid] = []
+        self.stream.emit("case_started", nodeid=nodeid, **self._case_fields(nodeid))
+
+    def pytest_runtest_logreport(self, report):
+        self._reports.setdefault(report.nodeid, []).append(report)
+        if report.when != "teardown":
+            return
+        outcome, message, duration = summarize_reports(self._reports.pop(report.nodeid))
+        self.stream.emit("case_finished", nodeid=report.nodeid, outcome=outcome, message=message,
+                         duration=duration, **self._case_fields(report.nodeid))
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        self.stream.emit("session_finished", exit_code=int(exitstatus),
+                         stopped=bool(session.shouldstop))
+
+    def _case_fields(self, nodeid):
+        ref = self._cases.get(nodeid)
+        if ref is None:
+            return {"case_id": nodeid, "path": None}
+        return {"case_id": ref.id, "path": ref.path}
+
+    def _read_commands(self):
+        """命令 "stop" 表示在当前用例结束后停止"""
+        for line in self.stream.commands:
+            if line.strip() == "stop" and self.session is not None:
+                logger.warning("收到停止请求，将在当前用例结束后停止")
+                self.session.shouldstop = "用户请求停止"
+                self.stream.emit("stop_requested")
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import logging
+import os
+import platform
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+from utils.case_repository import PROJECT_ROOT, get_repository
+from utils.data_loader import read_yaml
+
+logger = logging.getLogger("utils.incremental")
+
+SETTINGS_PATH = PROJECT_ROOT / "configs" / "settings.yaml"
+CASE_PATH_LABEL = "case_path"
+REUSED_TAG = "reused"
+
+
+def environment_fingerprint() -> str:
+    """执行环境指纹：settings.yaml内容及TLV可执行文件（和控件文件）的大小与修改时间"""
+    from core.method_catalog import file_version
+    parts = [hashlib.sha1(SETTINGS_PATH.read_bytes()).hexdigest()]
+    paths = read_yaml(str(SETTINGS_PATH)).get('paths', {})
+    for path in (paths.get('tlv_exe', {}).get(platform.system().lower()), paths.get('tlv_control')):
+        if path and Path(path).exists():
+            parts.append(file_version(path))
+    return "|".join(parts)
+
+
+def case_fingerprints(case_paths: Iterable[str], root="tests/cases") -> Dict[str, str]:
+    """各用例的指纹：用例内容哈希（来自用例索引）与环境指纹的组合"""
+    environment = environment_fingerprint()
+    entries = get_repository(root).entries()
+    return {
+        path: hashlib.sha1(f"{entries[path]['hash']}|{environment}".encode()).hexdigest()
+        for path in case_paths if path in entries
+    }
+
+
+class ResultArchive:
+    """
+    上次执行结果存档（.cache/last_results）
+    - state.json: {用例路径: {fingerprint, outcome, finished_at, passed_fingerprint}}
+    - <用例键>/: 该用例最近一次的Allure结果文件及其附件
+    增量执行时，未重新执行的用例从存档复制结果到本次结果目录，并标记为复用
+    """
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root else PROJECT_ROOT / ".cache" / "last_results"
+        self.state_path = self.root / "state.json"
+        self.state: Dict[str, dict] = {}
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def select(self, fingerprints: Dict[str, str], changed=False, failed=False) -> Tuple[List[str], List[str]]:
+        """
+        按上次结果划分要执行和可复用的用例（保持传入顺序）
+        :param fingerprints: 本次选中用例的 {路径: 指纹}
+        :param changed: 执行指纹与上次通过时不同（或从未通过）的用例
+        :param failed: 执行上次未通过的用例
+        :return: (要执行的用例, 复用上次结果的用例)
+        """
+        run, reused = [], []
+        for path, fingerprint in fingerprints.items():
+            state = self.state.get(path)
+            if state is None or not self._case_dir(path).exists():
+                run.append(path)
+            elif changed and state.get('passed_fingerprint') != fingerprint:
+                run.append(path)
+            elif failed and state['outcome'] != "passed":
+                run.append(path)
+            else:
+                reused.append(path)
+        return run, reused
+
+    def update(self, fingerprints: Dict[str, str], results_dir="temps"):
+        """将本次执行产生的结果存档（只处理带case_path标签的结果文件）"""
+        results_dir = Path(results_dir)
+        latest = {}
+        for result_file in results_dir.glob("*-result.json"):
+            try:
+                with open(result_file, encoding="utf-8") as f:
+                    result = json.load(f)
+            except (OSError, ValueError):
+                continue
+            path = _label(result, CASE_PATH_LABEL)
+            if path is None or _label(result, "tag", REUSED_TAG):
+                continue
+            if path not in latest or result.get('stop', 0) > latest[path][1].get('stop', 0):
+                latest[path] = (result_file, result)
+
+        for path, (result_file, result) in latest.items():
+            case_dir = self._case_dir(path)
+            shutil.rmtree(case_dir, ignore_errors=True)
+            case_dir.mkdir(parents=True)
+            for name in [result_file.name, *_attachment_sources(result)]:
+                source = results_dir / name
+                if source.exists():
+                    _link_or_copy(source, case_dir / name)
+            outcome = result.get('status', 'unknown')
+            previous = self.state.get(path, {})
+            fingerprint = fingerprints.get(path)
+            self.state[path] = {
+                'fingerprint': fingerprint,
+                'outcome': outcome,
+                'finished_at': time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(result.get('stop', 0) / 1000)),
+                'passed_fingerprint': fingerprint if outcome == "passed" else previous.get('passed_fingerprint'),
+            }
+        self._save_state()
+        if latest:
+            logger.info(f"已存档 {len(latest)} 个用例的执行结果")
+
+    def restore(self, case_paths: Iterable[str], results_dir="temps") -> int:
+        """把复用用例的存档结果复制到本次结果目录，并标记为复用"""
+        results_dir = Path(results_dir)
+        results_dir.mkdir(parents=True, exist_ok=True)
+        restored = 0
+        for path in case_paths:
+            case_dir = self._case_dir(path)
+            state = self.state.get(path, {})
+            for source in case_dir.glob("*"):
+                if not source.name.endswith("-result.json"):
+                    _link_or_copy(source, results_dir / source.name)
+                    continue
+                with open(source, encoding="utf-8") as f:
+                    result = json.load(f)
+                note = f"用例及环境未变化，复用 {state.get('finished_at', '上次')} 的执行结果"
+                result.setdefault('labels', []).append({'name': 'tag', 'value': REUSED_TAG})
+                result.setdefault('parameters', []).append({'name': '复用结果', 'value': note})
+                result['description'] = f"{note}\n\n{result.get('description', '')}"
+                with open(results_dir / source.name, "w", encoding="utf-8") as f:
+                    json.dump(result, f, ensure_ascii=False)
+                restored += 1
+        return restored
+
+    def _case_dir(self, path) -> Path:
+        return self.root / hashlib.sha1(path.encode()).hexdigest()[:16]
+
+    def _save_state(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+
+def _label(result, name, value=None):
+    for label in result.get('labels', []):
+        if label.get('name') == name and (value is None or label.get('value') == value):
+            return label.get('value')
+    return None
+
+
+def _attachment_sources(node):
+    """结果及其各级步骤中引用的附件文件名"""
+    for attachment in node.get('attachments', []):
+        yield attachment['source']
+    for step in node.get('steps', []):
+        yield from _attachment_sources(step)
+
+
+def _link_or_copy(source: Path, target: Path):
+    """优先使用硬链接，避免复制截图等大附件"""
+    try:
+        if target.exists():
+            target.unlink()
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+class IncrementalRun:
+    """一次执行的增量计划：确定要执行的用例，执行后存档结果并补回复用用例的结果"""
+
+    def __init__(self, case_paths: Iterable[str], changed=False, failed=False, root="tests/cases"):
+        """
+        :param case_paths: 选中的用例路径（需已在用例索引中）
+        :param changed: 只执行指纹变化的用例
+        :param failed: 只执行上次未通过的用例（与changed同时指定时取并集）
+        """
+        self.archive = ResultArchive()
+        self.fingerprints = case_fingerprints(case_paths, root)
+        if changed or failed:
+            self.run, self.reused = self.archive.select(self.fingerprints, changed, failed)
+            logger.info(f"增量执行: 执行 {len(self.run)} 个用例，复用 {len(self.reused)} 个用例的上次结果")
+        else:
+            self.run, self.reused = list(self.fingerprints), []
+
+    def finish(self, results_dir="temps"):
+        self.archive.update({path: self.fingerprints[path] for path in self.run}, results_dir)
+        if self.reused:
+            restored = self.archive.restore(self.reused, results_dir)
+            logger.info(f"已复用 {restored} 个用例的上次结果")
@@ -1,36 +1,192 @@
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import tempfile
 from pathlib import Path
-import allure
 from io import StringIO
+from utils.data_loader import read_yaml
 
 class AllureLogHandler(logging.Handler):
-    def __init__(self):
+    """
+    按测试用例捕获日志并附加到Allure报告
+    只记录 start_capture() 与 attach() 之间的日志；内存中超过上限后转存到临时文件，附件直接从文件读取
+    """
+
+    def __init__(self, max_memory=512 * 1024, spill_dir=None):
+        """
+        :param max_memory: 内存缓冲上限（字符数），超过后转存到临时文件
+        :param spill_dir: 临时文件目录（默认系统临时目录）
+        """
         super().__init__()
+        self.max_memory = max_memory
+        self.spill_dir = spill_dir
         self.log_buffer = StringIO()
+        self._size = 0
+        self._spill_file = None
+        self._capturing = False
+
+    def start_capture(self):
+        """开始捕获当前用例的日志（丢弃之前未附加的内容）"""
+        with self.lock:
+            self._reset()
+            self._capturing = True
 
     def emit(self, record):
+        if not self._capturing:
+            return
         try:
-            msg = self.format(record)
-            self.log_buffer.write(msg + '\n')
+            msg = self.format(record) + '\n'
+            if self._spill_file is not None:
+                self._spill_file.write(msg)
+                return
+            self.log_buffer.write(msg)
+            self._size += len(msg)
+            if self._size > self.max_memory:
+                self._spill()
         except Exception as e:
             sys.stderr.write(f"Allure日志错误: {str(e)}")
 
+    def attach(self, name="Runtime Log"):
+        """结束捕获并将日志附加到当前Allure用例"""
+        with self.lock:
+            self._capturing = False
+            import allure  # 仅在测试进程中使用
+            try:
+                if self._spill_file is not None:
+                    self._spill_file.flush()
+                    allure.attach.file(self._spill_file.name, name, allure.attachment_type.TEXT)
+                else:
+                    log_content = self.log_buffer.getvalue()
+                    if log_content:
+                        allure.attach(log_content, name, allure.attachment_type.TEXT)
+            finally:
+                self._reset()
+
+    def close(self):
+        with self.lock:
+            self._capturing = False
+            self._reset()
+        super().close()
+
+    def _spill(self):
+        self._spill_file = tempfile.NamedTemporaryFile(
+            mode='w', encoding='utf-8', prefix='allure-log-', suffix='.log',
+            dir=self.spill_dir, delete=False
+        )
+        self._spill_file.write(self.log_buffer.getvalue())
+        self.log_buffer = StringIO()
+        self._size = 0
+
+    def _reset(self):
+        if self._spill_file is not None:
+            self._spill_file.close()
+            try:
+                os.unlink(self._spill_file.name)
+            except OSError:
+                pass
+            self._spill_file = None
+        self.log_buffer = StringIO()
+        self._size = 0
+
+def _stream_closed(handler) -> bool:
+    return bool(getattr(getattr(handler, "stream", None), "closed", False))
+
+
+def _flush_handler(handler):
+    """刷新处理器；控制台处理器绑定的输出流可能已被关闭（如pytest替换的标准输出），此时忽略"""
+    try:
+        handler.flush()
+    except (OSError, ValueError):
+        pass
+
+
+class _LogPipeline:
+    """异步日志管线：根记录器只挂QueueHandler，后台QueueListener按各处理器级别分发"""
+
+    def __init__(self, handlers):
+        self.queue = queue.Queue(-1)
+        self.queue_handler = logging.handlers.QueueHandler(self.queue)
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+        self.running = True
+
+    @property
+    def handlers(self):
+        return self.listener.handlers
+
+    def add_handler(self, handler):
+        # 监听线程每条记录都重新读取handlers，直接替换元组即可
+        self.listener.handlers = self.listener.handlers + (handler,)
+
+    def remove_handler(self, handler):
+        self.listener.handlers = tuple(h for h in self.listener.handlers if h is not handler)
+
     def flush(self):
-        log_content = self.log_buffer.getvalue()
-        if log_content:
-            allure.attach(log_content, "Runtime Log", allure.attachment_type.TEXT)
-        self.log_buffer.truncate(0)
-        self.log_buffer.seek(0)
-
-def configure_logger(log_level=logging.DEBUG, log_file='tlv_auto.log', log_dir='logs'):
-    """配置根记录器"""
+        """等待队列中的记录全部处理完，再刷新各处理器的缓冲"""
+        if self.running:
+            self.queue.join()
+        for handler in self.listener.handlers:
+            _flush_handler(handler)
+
+    def stop(self):
+        # 输出流已关闭的处理器先摘除，避免监听线程写出剩余记录时报错
+        self.listener.handlers = tuple(h for h in self.listener.handlers if not _stream_closed(h))
+        if self.running:
+            self.running = False
+            self.listener.stop()
+        for handler in self.listener.handlers:
+            _flush_handler(handler)  # MemoryHandler在此写出剩余的批次
+
+
+_pipeline = None
+_owned_handlers = []
+_configured = None  # (配置参数, configure_logger的返回值)
+
+
+def _level(value):
+    return logging.getLevelName(value.upper()) if isinstance(value, str) else value
+
+
+def _close_handlers(logger):
+    """移除根记录器上已有的处理器，并关闭本模块创建的处理器（包括异步管线）"""
+    global _pipeline
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+    if _pipeline is not None:
+        _pipeline.stop()
+        _pipeline = None
+    while _owned_handlers:
+        _owned_handlers.pop().close()
+
+
+def configure_logger(log_level=logging.DEBUG, log_file='tlv_auto.log', log_dir='logs',
+                     allure_level=None, allure_max_memory=None, mode=None, force=False):
+    """
+    配置根记录器（未指定的参数读取settings.yaml的logging配置）
+    以相同参数重复调用时直接返回已有配置
+    :param allure_level: 附加到Allure报告的最低日志级别
+    :param allure_max_memory: 每个用例日志在内存中的上限（字符数），超过后转存到临时文件
+    :param mode: sync 在调用线程中直接写入; async 经队列由后台线程写入
+    :param force: 强制重新配置
+    """
+    global _configured
+    key = (log_level, log_file, str(log_dir), allure_level, allure_max_memory, mode)
+    if _configured is not None and _configured[0] == key and not force:
+        return _configured[1]
+
+    config = read_yaml("configs/settings.yaml").get('logging') or {}
+    if allure_level is None:
+        allure_level = config.get('allure_level', logging.DEBUG)
+    if allure_max_memory is None:
+        allure_max_memory = config.get('allure_max_memory', 512 * 1024)
+    mode = mode or config.get('mode', 'sync')
     logger = logging.getLogger()
 
     # 重置已存在的配置
-    if logger.handlers:
-        for handler in logger.handlers[:]:
-            logger.removeHandler(handler)
+    _close_handlers(logger)
 
     logger.setLevel(log_level)
 
@@ -46,25 +202,76 @@ def configure_logger(log_level=logging.DEBUG, log_file='tlv_auto.log', log_dir='
 
     # 文件处理器
     file_handler = logging.FileHandler(log_dir / log_file, encoding="utf-8")
-    file_handler.setLevel(log_level)
+    file_handler.setLevel(max(log_level, _level(config.get('file_level', log_level))))
     file_handler.setFormatter(formatter)
 
     # 控制台处理器
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(log_level)
+    console_handler.setLevel(max(log_level, _level(config.get('console_level', log_level))))
     console_handler.setFormatter(formatter)
 
     # Allure处理器
-    allure_handler = AllureLogHandler()
-    allure_handler.setLevel(log_level)
+    allure_handler = AllureLogHandler(max_memory=allure_max_memory)
+    allure_handler.setLevel(max(log_level, _level(allure_level)))
     allure_handler.setFormatter(formatter)
 
     # 添加处理器
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    logger.addHandler(allure_handler)
+    if mode == "async":
+        global _pipeline
+        # 文件写入按批次进行，ERROR及以上立即落盘
+        batch_size = config.get('batch_size', 64)
+        file_sink = logging.handlers.MemoryHandler(batch_size, flushLevel=logging.ERROR, target=file_handler)
+        file_sink.setLevel(file_handler.level)
+        _pipeline = _LogPipeline([file_sink, console_handler, allure_handler])
+        logger.addHandler(_pipeline.queue_handler)
+    else:
+        logger.addHandler(file_handler)
+        logger.addHandler(console_handler)
+        logger.addHandler(allure_handler)
+    _owned_handlers.extend([file_handler, console_handler, allure_handler])
+    if _pipeline is not None:
+        _owned_handlers.append(file_sink)  # 先于目标文件处理器关闭
+
+    _configured = (key, (logger, allure_handler, str(log_dir / log_file)))
+    return _configured[1]  # 返回logger、allure_handler和日志文件路径
+
+def get_logger():
+    """获取已配置的根记录器（尚未配置时按默认参数配置）"""
+    if _configured is None:
+        configure_logger()
+    return logging.getLogger()
+
+def add_log_handler(handler):
+    """添加日志输出（异步模式下由后台线程分发）"""
+    if _pipeline is not None:
+        _pipeline.add_handler(handler)
+    else:
+        logging.getLogger().addHandler(handler)
+
+def remove_log_handler(handler):
+    if _pipeline is not None:
+        _pipeline.remove_handler(handler)
+    logging.getLogger().removeHandler(handler)
+
+def get_log_handlers(handler_type=logging.Handler):
+    """当前生效的日志输出（包括异步管线中的处理器）"""
+    handlers = list(logging.getLogger().handlers)
+    if _pipeline is not None:
+        handlers.extend(_pipeline.handlers)
+    return [handler for handler in handlers if isinstance(handler, handler_type)]
+
+def flush_logging():
+    """等待已提交的日志全部写出（用例边界和退出时调用）"""
+    if _pipeline is not None:
+        _pipeline.flush()
+    else:
+        for handler in logging.getLogger().handlers:
+            _flush_handler(handler)
 
-    return logger, allure_handler, str(log_dir / log_file)  # 返回logger、allure_handler和日志文件路径
+def shutdown_logging():
+    """停止异步日志线程并关闭所有处理器"""
+    global _configured
+    _close_handlers(logging.getLogger())
+    _configured = None
 
-# 默认配置
-default_logger, default_allure_handler, default_log_file = configure_logger()
+atexit.register(shutdown_logging)
@@ -0,0 +1,175 @@
+import logging
+import multiprocessing
+import os
+import queue
+import shutil
+import time
+from pathlib import Path
+from utils.duration_history import get_history
+from utils.progress import ProgressTracker
+from utils.worker_context import WORKER_ENV
+
+logger = logging.getLogger("utils.parallel_runner")
+
+RESULTS_DIR = Path("temps")
+
+
+class _CaseReports:
+    """worker中的pytest插件：收集当前用例各阶段的报告，得出实际结果"""
+
+    def __init__(self):
+        self.reports = []
+
+    def pytest_runtest_logreport(self, report):
+        self.reports.append(report)
+
+    def result(self, exit_code):
+        """返回 (结果, 耗时)；没有执行任何用例（如未收集到）时，按退出码判断是跳过还是失败"""
+        from utils.event_stream import summarize_reports
+        if not self.reports:
+            outcome = "skipped" if exit_code in (0, 5) else "failed"  # 5: 没有收集到用例
+            return outcome, None
+        outcome, _, duration = summarize_reports(self.reports)
+        return outcome, duration
+
+
+def _worker_main(worker_id, case_queue, result_queue, extra_args=()):
+    """worker进程入口：独占一个TLV实例，逐个领取用例执行"""
+    os.environ[WORKER_ENV] = str(worker_id)
+
+    # 以下导入放在子进程内，保证日志/截图路径按worker隔离
+    import pytest
+    from core.app_pool import shutdown_shared_pool
+    from utils.case_collector import CaseCollector
+    from utils.logger_config import configure_logger, shutdown_logging
+    from utils.worker_context import output_dir
+
+    # 每个用例一次pytest.main，会话级清理（conftest）在worker中跳过，输出目录在此清理一次
+    log_dir = output_dir("logs")
+    for directory in (log_dir, output_dir("logs/screenshots")):
+        shutil.rmtree(directory, ignore_errors=True)
+        directory.mkdir(parents=True, exist_ok=True)
+    configure_logger(log_dir=str(log_dir))
+
+    def pytest_args(case_path):
+        case_log = Path(case_path).with_suffix("").as_posix().replace("/", "_")
+        return [
+            "-o", "addopts=",  # 忽略pytest.ini中的--alluredir/--clean-alluredir
+            "-s", "-v",
+            f"--log-file={log_dir / f'pytest-{case_log}.log'}",  # 按用例区分，避免逐个用例覆盖
+            f"--alluredir={RESULTS_DIR / f'worker-{worker_id}'}",
+            "--app-mode=pool",
+            "--keep-app-pool",
+            *extra_args,
+            "tests/test_suite.py",
+        ]
+
+    try:
+        while True:
+            case_path = case_queue.get()
+            if case_path is None:
+                break
+            result_queue.put(("start", worker_id, case_path, None))
+            reports = _CaseReports()
+            exit_code = int(pytest.main(pytest_args(case_path), plugins=[CaseCollector([case_path]), reports]))
+            result_queue.put(("done", worker_id, case_path, (exit_code, *reports.result(exit_code))))
+    finally:
+        shutdown_shared_pool()
+        shutdown_logging()
+
+
+class ParallelRunner:
+    """多进程并行执行：每个worker一个TLV实例，结果合并到temps目录"""
+
+    def __init__(self, workers: int, extra_args=()):
+        """
+        :param workers: worker进程数
+        :param extra_args: 传给每个worker中pytest的附加参数
+        """
+        self.workers = workers
+        self.extra_args = tuple(extra_args)
+        self.ctx = multiprocessing.get_context("spawn")
+
+    def run(self, case_paths, schedule=None) -> int:
+        """
+        执行用例并返回汇总的退出码
+        :param case_paths: 用例相对路径列表，按此顺序分发（worker按路径从索引加载用例）
+        :param schedule: utils.scheduler.Schedule，提供时写入执行元数据
+        """
+        cases = list(case_paths)
+        self._prepare_results_dir()
+        if schedule is not None:
+            from utils.scheduler import write_run_metadata
+            write_run_metadata(schedule, RESULTS_DIR)
+        case_queue = self.ctx.Queue()
+        result_queue = self.ctx.Queue()
+        for case_path in cases:
+            case_queue.put(case_path)
+        worker_count = min(self.workers, len(cases)) or 1
+        for _ in range(worker_count):
+            case_queue.put(None)
+
+        processes = [
+            self.ctx.Process(target=_worker_main, args=(i, case_queue, result_queue, self.extra_args), name=f"tlv-worker-{i}")
+            for i in range(worker_count)
+        ]
+        logger.info(f"启动 {worker_count} 个worker并行执行 {len(cases)} 个用例")
+        for process in processes:
+            process.start()
+
+        tracker = ProgressTracker(cases, get_history().case_medians(cases), parallelism=worker_count)
+        exit_codes, running = self._collect(processes, result_queue, tracker)
+        for process in processes:
+            process.join()
+
+        for worker_id, case_path in running.items():
+            logger.error(f"worker-{worker_id} 异常退出，用例未完成: {case_path}")
+            exit_codes.append(1)
+
+        self._merge_results(worker_count)
+        return max(exit_codes, default=0)
+
+    def _collect(self, processes, result_queue, tracker):
+        """收集worker回报，直到全部用例完成或worker全部退出"""
+        exit_codes = []
+        running = {}
+        started = {}
+        while tracker.done < tracker.total:
+            try:
+                event, worker_id, case_path, result = result_queue.get(timeout=1)
+            except queue.Empty:
+                if not any(p.is_alive() for p in processes):
+                    break
+                continue
+            if event == "start":
+                running[worker_id] = case_path
+                started[case_path] = time.monotonic()
+                tracker.case_started(case_path)
+                logger.info(f"worker-{worker_id} 开始执行: {case_path}")
+            else:
+                exit_code, outcome, duration = result
+                running.pop(worker_id, None)
+                exit_codes.append(exit_code)
+                elapsed = time.monotonic() - started.pop(case_path, time.monotonic())
+                tracker.case_finished(case_path, outcome, elapsed if duration is None else duration)
+                logger.info(f"worker-{worker_id} 完成: {case_path} ({outcome}, 返回码 {exit_code}) {tracker.summary()}")
+        return exit_codes, running
+
+    @staticmethod
+    def _prepare_results_dir():
+        """等价于--clean-alluredir"""
+        if RESULTS_DIR.exists():
+            shutil.rmtree(RESULTS_DIR)
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def _merge_results(worker_count):
+        """将各worker的Allure结果合并到同一结果集（文件名为uuid，不会冲突）"""
+        for worker_id in range(worker_count):
+            worker_dir = RESULTS_DIR / f"worker-{worker_id}"
+            if not worker_dir.exists():
+                continue
+            for result_file in worker_dir.iterdir():
+                shutil.move(str(result_file), str(RESULTS_DIR / result_file.name))
+            worker_dir.rmdir()
+        logger.info(f"已合并 {worker_count} 个worker的测试结果到 {RESULTS_DIR}")
@@ -0,0 +1,105 @@
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from utils.case_plan import CasePlan
+
+logger = logging.getLogger("utils.prefix_planner")
+
+
+def idempotent_prefix(plan: CasePlan) -> Tuple[str, ...]:
+    """用例开头连续的幂等步骤的签名"""
+    prefix = []
+    for step in plan.steps:
+        if not step.idempotent:
+            break
+        prefix.append(step.signature)
+    return tuple(prefix)
+
+
+class _Node:
+    __slots__ = ("children", "cases", "tails", "first")
+
+    def __init__(self, first):
+        self.children: Dict[str, '_Node'] = {}  # 按首次出现的顺序
+        self.cases: List[str] = []  # 幂等前缀恰好到此为止、且没有后续步骤的用例
+        self.tails: List[str] = []  # 幂等前缀恰好到此为止、之后还有非幂等步骤的用例
+        self.first = first  # 子树中最早出现的用例位置
+
+
+def group_by_prefix(case_paths: Iterable[str], load_plan: Callable[[str], CasePlan]) -> List[str]:
+    """
+    按幂等前缀的前缀树重排用例，使前缀相同的用例相邻执行（同一应用实例上可复用已执行的前缀）
+    没有幂等前缀的用例保持原位置，各前缀组按组内最早出现的位置排列
+    组内先执行只包含前缀的用例（执行后应用上恰好是该前缀，后面的用例可以复用），
+    再执行更长前缀的用例，最后是前缀之后还有其他步骤的用例（执行后应用状态超出前缀，之后无法复用）
+    :param load_plan: 按路径加载用例计划的函数，加载失败（结构错误等）的用例视为没有前缀
+    """
+    case_paths = list(case_paths)
+    root = _Node(0)
+    for position, path in enumerate(case_paths):
+        try:
+            plan = load_plan(path)
+            prefix = idempotent_prefix(plan)
+            has_tail = len(plan.steps) > len(prefix)
+        except Exception:
+            prefix, has_tail = (), True
+        node = root
+        for signature in prefix:
+            if signature not in node.children:
+                node.children[signature] = _Node(position)
+            node = node.children[signature]
+        (node.tails if has_tail and prefix else node.cases).append(path)
+
+    # 顶层：无前缀的用例各自为一个单元，每个前缀子树为一个单元
+    units = [(position, [path]) for position, path in _positions(root.cases, case_paths)]
+    units += [(child.first, _flatten(child)) for child in root.children.values()]
+    units.sort(key=lambda unit: unit[0])
+    ordered = [path for _, paths in units for path in paths]
+
+    shared = [child for child in root.children.values() if len(_flatten(child)) > 1]
+    if shared:
+        logger.info(f"共享前缀分组: {len(shared)} 组，共 {sum(len(_flatten(c)) for c in shared)} 个用例")
+    return ordered
+
+
+def _positions(paths, case_paths):
+    index = {path: i for i, path in enumerate(case_paths)}
+    return [(index[path], path) for path in paths]
+
+
+def _flatten(node: _Node) -> List[str]:
+    paths = list(node.cases)
+    for child in node.children.values():
+        paths.extend(_flatten(child))
+    paths.extend(node.tails)
+    return paths
+
+
+class PrefixSession:
+    """
+    单个用例在应用实例上的前缀复用
+    应用记录自插入控件以来执行过的全部步骤签名（applied_steps），只有这整个序列恰好是
+    本用例幂等前缀的开头时才能复用，否则应用中存在本用例不期望的状态
+    用例执行中状态不确定，先清除记录，全部步骤通过后再记录
+    """
+
+    def __init__(self, app, plan: CasePlan):
+        self.app = app
+        self.plan = plan
+        self.prefix = idempotent_prefix(plan)
+        applied = getattr(app, "applied_steps", ())
+        self.reused = len(applied) if applied and self.prefix[:len(applied)] == applied else 0
+        self.origins = tuple(app.applied_origins[:self.reused]) if self.reused else ()
+        app.applied_steps, app.applied_origins = (), ()
+
+    def origin(self, step) -> Optional[str]:
+        """步骤可复用时返回实际执行它的用例ID，否则返回None"""
+        return self.origins[step.index] if step.index < self.reused else None
+
+    def finish(self):
+        """
+        用例全部步骤通过后，记录应用上执行过的步骤序列（复用的前缀加本用例执行的步骤）
+        前缀之后还执行了非幂等步骤时，该序列不会是任何用例幂等前缀的开头，之后不再复用
+        """
+        steps = tuple(step.signature for step in self.plan.steps)
+        self.app.applied_steps = steps
+        self.app.applied_origins = self.origins + (self.plan.id,) * (len(steps) - len(self.origins))
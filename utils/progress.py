@@ -0,0 +1,150 @@
+import logging
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from utils.duration_history import get_history
+from utils.event_stream import emit_event, summarize_reports
+from utils.worker_context import get_worker_id
+
+logger = logging.getLogger("utils.progress")
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "未知"
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}小时{seconds % 3600 // 60}分"
+    if seconds >= 60:
+        return f"{seconds // 60}分{seconds % 60}秒"
+    return f"{seconds}秒"
+
+
+class ProgressTracker:
+    """
+    执行进度与剩余时间估计
+    剩余时间 = 未完成用例的历史耗时中位数之和 × 本次实际/历史的比例，按并行数均摊
+    没有历史的用例按已知中位数（或本次平均耗时）估计
+    """
+
+    def __init__(self, case_paths: Iterable[str], estimates: Dict[str, float], parallelism=1):
+        """
+        :param case_paths: 本次要执行的用例路径
+        :param estimates: {用例路径: 历史耗时中位数}
+        :param parallelism: 同时执行的用例数
+        """
+        self.pending = list(dict.fromkeys(case_paths))
+        self.total = len(self.pending)
+        self.estimates = estimates
+        self.parallelism = max(1, parallelism)
+        self.outcomes = {"passed": 0, "failed": 0, "skipped": 0}
+        self.running = {}  # 用例路径 -> 开始时间
+        self._actual = 0.0  # 有历史记录的已完成用例的实际耗时
+        self._expected = 0.0  # 及其历史中位数
+        self._durations = []
+        self._default = statistics.median(estimates.values()) if estimates else None
+
+    @property
+    def done(self) -> int:
+        return sum(self.outcomes.values())
+
+    def case_started(self, case_path: str):
+        self.running[case_path] = time.monotonic()
+
+    def case_finished(self, case_path: str, outcome: str, duration: float):
+        self.running.pop(case_path, None)
+        try:
+            self.pending.remove(case_path)
+        except ValueError:
+            pass
+        key = outcome if outcome in self.outcomes else "failed"
+        self.outcomes[key] += 1
+        if outcome != "skipped":
+            self._durations.append(duration)
+            if case_path in self.estimates:
+                self._actual += duration
+                self._expected += self.estimates[case_path]
+
+    def eta(self) -> Optional[float]:
+        """预计剩余秒数，无法估计时返回None"""
+        if not self.pending:
+            return 0.0
+        default = self._default
+        if default is None and self._durations:
+            default = sum(self._durations) / len(self._durations)
+        if default is None:
+            return None
+        # 本次执行比历史快/慢时按比例修正（限制在0.5~2倍）
+        scale = min(2.0, max(0.5, self._actual / self._expected)) if self._expected else 1.0
+        now = time.monotonic()
+        remaining = 0.0
+        for case_path in self.pending:
+            estimate = self.estimates.get(case_path, default) * scale
+            started = self.running.get(case_path)
+            if started is not None:
+                estimate = max(0.0, estimate - (now - started))
+            remaining += estimate
+        return remaining / self.parallelism
+
+    def snapshot(self) -> dict:
+        return dict(done=self.done, total=self.total, eta=self.eta(), **self.outcomes)
+
+    def summary(self) -> str:
+        return (f"进度 {self.done}/{self.total} (通过 {self.outcomes['passed']}, 失败 {self.outcomes['failed']}, "
+                f"跳过 {self.outcomes['skipped']}) 预计剩余 {format_duration(self.eta())}")
+
+
+class ProgressPlugin:
+    """
+    pytest插件：每个用例结束时记录耗时历史，并输出进度（日志和progress事件）
+    并行worker只记录历史，进度由主进程汇总
+    """
+
+    def __init__(self, report=None):
+        """
+        :param report: 是否输出进度，默认仅在非worker进程中输出
+        """
+        self.report = get_worker_id() is None if report is None else report
+        self.history = get_history()
+        self.tracker = None
+        self._cases = {}  # nodeid -> CaseRef
+        self._reports = {}  # nodeid -> [TestReport]
+
+    def pytest_collection_finish(self, session):
+        for item in session.items:
+            callspec = getattr(item, "callspec", None)
+            if callspec is not None and "case" in callspec.params:
+                self._cases[item.nodeid] = callspec.params["case"]
+        paths = [self._path(item.nodeid) for item in session.items]
+        self.tracker = ProgressTracker(paths, self.history.case_medians(paths) if self.report else {})
+        if self.report and paths:
+            logger.info(f"共 {len(paths)} 个用例，预计耗时 {format_duration(self.tracker.eta())}")
+            emit_event("progress", **self.tracker.snapshot())
+
+    def pytest_runtest_logstart(self, nodeid, location):
+        if self.tracker is not None:
+            self.tracker.case_started(self._path(nodeid))
+
+    def pytest_runtest_logreport(self, report):
+        self._reports.setdefault(report.nodeid, []).append(report)
+        if report.when != "teardown":
+            return
+        outcome, _, duration = summarize_reports(self._reports.pop(report.nodeid))
+        case_path = self._path(report.nodeid)
+        ref = self._cases.get(report.nodeid)
+        if ref is not None:
+            self.history.record_case(case_path, ref.id, outcome, duration)
+            self.history.commit()
+        if self.tracker is not None:
+            self.tracker.case_finished(case_path, outcome, duration)
+            if self.report:
+                logger.info(self.tracker.summary())
+                emit_event("progress", **self.tracker.snapshot())
+
+    def pytest_sessionfinish(self, session):
+        self.history.commit()
+
+    def _path(self, nodeid):
+        ref = self._cases.get(nodeid)
+        return Path(ref.path).as_posix() if ref is not None else nodeid
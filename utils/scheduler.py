@@ -0,0 +1,129 @@
+import heapq
+import json
+import logging
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+from utils.case_plan import CasePlan
+from utils.data_loader import read_yaml
+from utils.duration_history import DurationHistory, get_history
+from utils.prefix_planner import group_by_prefix
+
+logger = logging.getLogger("utils.scheduler")
+
+ORDERS = ("auto", "none", "fail-first", "duration")
+
+
+class Schedule(NamedTuple):
+    """用例执行顺序及按历史耗时预测的worker分配"""
+    order: str  # 实际采用的排序方式
+    paths: List[str]  # 执行顺序
+    workers: int
+    estimates: Dict[str, float]  # {用例路径: 估计耗时}
+    reasons: Dict[str, str]  # {用例路径: failed/flaky}，fail-first时提前的原因
+    assignments: List[List[str]]  # 按执行顺序模拟分发得到的各worker用例
+    predicted_makespan: Optional[float]  # 预计总耗时（无历史时为None）
+
+
+def resolve_order(order: Optional[str] = None, workers=1) -> str:
+    """确定排序方式：未指定时读取settings.yaml的schedule.order，auto按worker数选择"""
+    order = order or (read_yaml("configs/settings.yaml").get('schedule') or {}).get('order', 'auto')
+    if order not in ORDERS:
+        raise ValueError(f"不支持的用例排序方式: {order}（可选: {', '.join(ORDERS)}）")
+    if order == "auto":
+        order = "duration" if workers > 1 else "none"
+    return order
+
+
+def schedule_cases(case_paths: Iterable[str], order: Optional[str] = None, workers=1,
+                   history: DurationHistory = None, window: Optional[int] = None,
+                   load_plan: Optional[Callable[[str], CasePlan]] = None) -> Schedule:
+    """
+    按历史记录安排用例顺序
+    - none: 保持索引顺序
+    - duration: 耗时长的优先（并行时各worker从队列领取，长用例先行使各worker接近同时结束）
+    - fail-first: 最近一次失败的用例最先，其次是最近结果不稳定的用例，其余在后；
+      组内单进程时短用例优先（尽早反馈），并行时长用例优先
+    - auto: 并行时为duration，否则为none
+    :param order: 排序方式，None时读取settings.yaml的schedule.order（见resolve_order）
+    :param window: fail-first参考的最近执行次数，None时读取schedule.history_window
+    :param load_plan: 提供时（单worker）在排序后把幂等前缀相同的用例排在一起，见utils.prefix_planner
+    """
+    order = resolve_order(order, workers)
+    window = window or (read_yaml("configs/settings.yaml").get('schedule') or {}).get('history_window', 10)
+
+    paths = list(dict.fromkeys(case_paths))
+    history = history or get_history()
+    known = history.case_medians(paths)
+    default = statistics.median(known.values()) if known else None
+    estimates = {path: known.get(path, default) for path in paths} if default is not None else {}
+    duration = estimates.get
+
+    reasons = {}
+    if order == "fail-first":
+        for path, recent in history.recent_outcomes(paths, window).items():
+            if recent[0] == "failed":
+                reasons[path] = "failed"
+            elif "failed" in recent and "passed" in recent:
+                reasons[path] = "flaky"
+        rank = {"failed": 0, "flaky": 1}
+        if workers > 1:
+            key = lambda path: (rank.get(reasons.get(path), 2), -(duration(path) or 0.0))
+        else:
+            key = lambda path: (rank.get(reasons.get(path), 2),
+                                (duration(path) or 0.0) if path in reasons else 0.0)
+        paths.sort(key=key)
+    elif order == "duration":
+        paths.sort(key=lambda path: -(duration(path) or 0.0))
+
+    if load_plan is not None and workers == 1:
+        # 并行时用例从共享队列领取，相邻用例不一定落在同一worker上，不做分组
+        paths = group_by_prefix(paths, load_plan)
+
+    assignments, makespan = _simulate(paths, workers, estimates)
+    schedule = Schedule(order, paths, workers, estimates, reasons, assignments, makespan)
+    if reasons:
+        logger.info(f"优先执行最近失败/不稳定的用例: {len(reasons)} 个")
+    return schedule
+
+
+def _simulate(paths, workers, estimates):
+    """模拟worker按顺序从队列领取用例（最先空闲的worker领取下一个）"""
+    workers = max(1, min(workers, len(paths) or 1))
+    assignments = [[] for _ in range(workers)]
+    if not estimates:
+        for i, path in enumerate(paths):
+            assignments[i % workers].append(path)
+        return assignments, None
+    heap = [(0.0, worker) for worker in range(workers)]
+    for path in paths:
+        finish, worker = heapq.heappop(heap)
+        assignments[worker].append(path)
+        heapq.heappush(heap, (finish + estimates[path], worker))
+    return assignments, max(finish for finish, _ in heap)
+
+
+def write_run_metadata(schedule: Schedule, results_dir="temps"):
+    """将本次执行顺序和预测分配写入 <结果目录>/run-metadata.json"""
+    path = Path(results_dir) / "run-metadata.json"
+    metadata = {
+        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "order": schedule.order,
+        "workers": schedule.workers,
+        "predicted_makespan": schedule.predicted_makespan,
+        "cases": [
+            {"path": case_path, "estimate": schedule.estimates.get(case_path), "reason": schedule.reasons.get(case_path)}
+            for case_path in schedule.paths
+        ],
+        "assignments": [
+            {"worker": worker, "cases": cases, "estimate": sum(schedule.estimates.get(p) or 0.0 for p in cases)}
+            for worker, cases in enumerate(schedule.assignments)
+        ],
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(metadata, ensure_ascii=False, indent=2), encoding="utf-8")
+    except OSError as e:
+        logger.warning(f"写入执行元数据失败: {str(e)}")
+    return path
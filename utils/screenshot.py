@@ -1,25 +1,83 @@
 import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from io import BytesIO
 import allure
-from pywinauto.findwindows import ElementNotFoundError
+from utils.data_loader import read_yaml
+from utils.worker_context import output_dir
 
 
 logger = logging.getLogger("utils.screenshot")
 
+# 格式: (PIL格式名, 文件扩展名, Allure附件类型)
+_FORMATS = {
+    "png": ("PNG", "png", allure.attachment_type.PNG),
+    "jpeg": ("JPEG", "jpg", allure.attachment_type.JPG),
+    "jpg": ("JPEG", "jpg", allure.attachment_type.JPG),
+}
 
-def take_screenshot(window, suffix=None, screenshot_dir="logs/screenshots"):
-    """窗口截图工具（修正版）"""
-    logger.debug(f"开始截图操作，后缀参数: {suffix}")
-    try:
-        # 检查窗口状态
-        if not window.is_visible():
-            logger.warning("窗口不可见，尝试等待可见状态")
-            window.wait("visible", timeout=5)
 
-        # 创建目录
-        dir_path = Path(screenshot_dir)
+class ScreenshotService:
+    """
+    截图服务：同步抓图，后台线程池只编码一次，
+    本地文件和Allure附件使用同一份编码结果；附件在flush时（测试线程中）提交，
+    在step_scope内截取的图片于该步骤结束时附加到该步骤
+    """
+
+    def __init__(self, image_format="png", compress_level=1, quality=85, max_workers=2, region=None):
+        """
+        :param image_format: 图片格式 png/jpeg
+        :param compress_level: PNG压缩级别 0-9，越小编码越快
+        :param quality: JPEG质量 1-95
+        :param max_workers: 后台编码线程数
+        :param region: 默认裁剪区域 (left, top, right, bottom)，相对窗口左上角
+        """
+        if image_format.lower() not in _FORMATS:
+            raise ValueError(f"不支持的截图格式: {image_format}")
+        self.pil_format, self.extension, self.attachment_type = _FORMATS[image_format.lower()]
+        self.compress_level = compress_level
+        self.quality = quality
+        self.region = region
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="screenshot")
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def capture(self, window, suffix=None, screenshot_dir=None, region=None) -> str:
+        """同步抓取窗口图像，编码与写盘在后台完成，返回截图文件路径"""
+        logger.debug(f"开始截图操作，后缀参数: {suffix}")
+        return self.submit(self.grab(window, region), suffix, screenshot_dir)
+
+    def grab(self, window, region=None):
+        """只抓取图像（不编码），返回PIL图像"""
+        from pywinauto.findwindows import ElementNotFoundError
+        try:
+            # 检查窗口状态
+            if not window.is_visible():
+                logger.warning("窗口不可见，尝试等待可见状态")
+                window.wait("visible", timeout=5)
+            img = window.capture_as_image()
+        except ElementNotFoundError:
+            error_msg = "截图失败：目标窗口未找到"
+            allure.attach(error_msg, name="SCREENSHOT_ERROR", attachment_type=allure.attachment_type.TEXT)
+            raise
+        except Exception as e:
+            logger.error(f"截图失败: {str(e)}", exc_info=True)
+            error_msg = f"截图失败：{str(e)}"
+            allure.attach(error_msg, name="SCREENSHOT_ERROR", attachment_type=allure.attachment_type.TEXT)
+            raise
+
+        region = region or self.region
+        if region:
+            img = img.crop(tuple(region))
+        return img
+
+    def submit(self, img, suffix=None, screenshot_dir=None) -> str:
+        """提交已抓取的图像到后台编码"""
+        dir_path = Path(screenshot_dir) if screenshot_dir else output_dir("logs/screenshots")
         dir_path.mkdir(parents=True, exist_ok=True)
 
         # 生成文件名
@@ -27,27 +85,178 @@ def take_screenshot(window, suffix=None, screenshot_dir="logs/screenshots"):
         filename = f"screenshot_{timestamp}"
         if suffix:
             filename += f"_{suffix.replace(' ', '_')}"
-        filename += ".png"
+        filename += f".{self.extension}"
+        file_path = dir_path / filename
+
+        future = self._executor.submit(self._encode_and_write, img, file_path)
+        with self._lock:
+            self._pending.append((future, f"Screenshot: {suffix}" if suffix else "操作截图"))
+        return str(file_path)
+
+    def flush(self):
+        """等待后台编码完成并附加到Allure报告（需在测试线程中调用）"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for future, name in pending:
+            try:
+                data = future.result()
+            except Exception as e:
+                logger.error(f"截图编码失败: {str(e)}", exc_info=True)
+                allure.attach(f"截图失败：{str(e)}", name="SCREENSHOT_ERROR",
+                              attachment_type=allure.attachment_type.TEXT)
+                continue
+            allure.attach(data, name=name, attachment_type=self.attachment_type)
+
+    @contextmanager
+    def step_scope(self):
+        """
+        在allure.step内使用：范围结束时（包括断言失败）等待范围内截图的编码完成并附加到当前步骤
+        范围外（外层步骤）已提交的截图不受影响
+        """
+        with self._lock:
+            outer, self._pending = self._pending, []
+        try:
+            yield
+        finally:
+            try:
+                self.flush()
+            finally:
+                with self._lock:
+                    self._pending = outer + self._pending
 
-        # 保存截图到本地
-        img = window.capture_as_image()
-        img.save(str(dir_path / filename))
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
 
-        # 附加到Allure报告
+    def _encode_and_write(self, img, file_path) -> bytes:
         buffer = BytesIO()
-        img.save(buffer, format="PNG")
-        allure.attach(
-            buffer.getvalue(),
-            name=f"Screenshot: {suffix}" if suffix else "操作截图",
-            attachment_type=allure.attachment_type.PNG
-        )
-        return str(dir_path / filename)
-    except ElementNotFoundError:
-        error_msg = "截图失败：目标窗口未找到"
-        allure.attach(error_msg, name="SCREENSHOT_ERROR", attachment_type=allure.attachment_type.TEXT)
-        raise
-    except Exception as e:
-        logger.error(f"截图失败: {str(e)}", exc_info=True)
-        error_msg = f"截图失败：{str(e)}"
-        allure.attach(error_msg, name="SCREENSHOT_ERROR", attachment_type=allure.attachment_type.TEXT)
-        raise
+        if self.pil_format == "PNG":
+            img.save(buffer, format="PNG", compress_level=self.compress_level)
+        else:
+            img.convert("RGB").save(buffer, format=self.pil_format, quality=self.quality)
+        data = buffer.getvalue()
+        with open(file_path, 'wb') as f:
+            f.write(data)
+        return data
+
+
+class ScreenshotRecorder:
+    """
+    按策略记录截图：
+    always     每次都编码写盘并附加到报告
+    on_failure 只在内存环形缓冲中保留每个用例最近N帧，用例失败时才写盘和附加
+    on_change  与上一帧相比画面有变化时才保存
+    """
+
+    POLICIES = ("always", "on_failure", "on_change")
+
+    def __init__(self, service: ScreenshotService, policy="always", buffer_size=5, change_threshold=2.0):
+        """
+        :param policy: 截图策略
+        :param buffer_size: on_failure模式下每个用例保留的帧数
+        :param change_threshold: on_change模式下判定画面变化的平均灰度差
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"不支持的截图策略: {policy}")
+        self.service = service
+        self.policy = policy
+        self.change_threshold = change_threshold
+        self._frames = deque(maxlen=buffer_size)
+        self._last_thumbnail = None
+
+    def capture(self, window, suffix=None, screenshot_dir=None, region=None):
+        """按策略截图，实际写盘时返回文件路径，否则返回None"""
+        if self.policy == "always":
+            return self.service.capture(window, suffix, screenshot_dir, region)
+
+        img = self.service.grab(window, region)
+        if self.policy == "on_failure":
+            self._frames.append((img, suffix, screenshot_dir))
+            return None
+
+        thumbnail = list(img.convert("L").resize((32, 32)).getdata())
+        if self._last_thumbnail is not None and not self._changed(self._last_thumbnail, thumbnail):
+            logger.debug(f"画面无变化，跳过截图: {suffix}")
+            return None
+        self._last_thumbnail = thumbnail
+        return self.service.submit(img, suffix, screenshot_dir)
+
+    def finish(self, failed: bool):
+        """用例结束：失败时落盘缓冲帧，然后提交所有附件"""
+        if failed and self._frames:
+            logger.info(f"用例失败，保存最近 {len(self._frames)} 帧截图")
+            for img, suffix, screenshot_dir in self._frames:
+                self.service.submit(img, suffix, screenshot_dir)
+        self._frames.clear()
+        self._last_thumbnail = None
+        self.service.flush()
+
+    def _changed(self, previous, current) -> bool:
+        diff = sum(abs(a - b) for a, b in zip(previous, current)) / len(current)
+        return diff >= self.change_threshold
+
+
+_service = None
+_recorder = None
+_service_lock = threading.Lock()
+
+
+def get_screenshot_service() -> ScreenshotService:
+    """按settings.yaml中的screenshot配置创建共享截图服务"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            config = read_yaml("configs/settings.yaml").get('screenshot', {})
+            _service = ScreenshotService(
+                image_format=config.get('format', 'png'),
+                compress_level=config.get('compress_level', 1),
+                quality=config.get('quality', 85),
+                max_workers=config.get('max_workers', 2),
+                region=config.get('region'),
+            )
+        return _service
+
+
+def get_screenshot_recorder(policy=None) -> ScreenshotRecorder:
+    """
+    获取共享截图记录器
+    :param policy: 指定策略（为None时使用settings.yaml中的screenshot.policy）
+    """
+    global _recorder
+    service = get_screenshot_service()
+    with _service_lock:
+        if _recorder is None or (policy and policy != _recorder.policy):
+            config = read_yaml("configs/settings.yaml").get('screenshot', {})
+            _recorder = ScreenshotRecorder(
+                service,
+                policy=policy or config.get('policy', 'always'),
+                buffer_size=config.get('buffer_size', 5),
+                change_threshold=config.get('change_threshold', 2.0),
+            )
+        return _recorder
+
+
+def take_screenshot(window, suffix=None, screenshot_dir=None, region=None):
+    """窗口截图工具：按截图策略抓图，编码和写盘在后台进行"""
+    return get_screenshot_recorder().capture(window, suffix, screenshot_dir, region)
+
+
+def step_screenshots():
+    """步骤内的截图附加到该步骤（与allure.step一起使用，放在其内层）"""
+    return get_screenshot_service().step_scope()
+
+
+def flush_screenshots(failed=False):
+    """用例结束时调用：失败时保存缓冲帧，等待未完成的截图并提交Allure附件（步骤外的截图附加到用例）"""
+    if _recorder is not None:
+        _recorder.finish(failed)
+    elif _service is not None:
+        _service.flush()
+
+
+def shutdown_screenshots():
+    """关闭共享截图服务（会话结束时调用）"""
+    global _service, _recorder
+    with _service_lock:
+        service, _service, _recorder = _service, None, None
+    if service is not None:
+        service.shutdown()
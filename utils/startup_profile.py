@@ -0,0 +1,40 @@
+import sys
+import time
+from collections import Counter
+
+# 启动阶段不应出现、只在真正需要时才导入的重型模块
+HEAVY_MODULES = ("PyQt5", "pywinauto", "comtypes", "pytest", "allure", "PIL", "win32clipboard")
+
+
+class StartupProfile:
+    """
+    启动耗时报告：按阶段记录耗时和新导入的模块（按顶层包汇总）
+    用于 run.py --startup-profile，观察启动路径是否引入了不必要的导入
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.phases = []  # (阶段名, 耗时秒, {顶层包: 模块数})
+        self._start = self._last = time.perf_counter()
+        self._modules = set(sys.modules)
+
+    def mark(self, phase: str):
+        """记录从上一个标记到现在的阶段"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        current = set(sys.modules)
+        packages = Counter(name.partition(".")[0] for name in current - self._modules)
+        self.phases.append((phase, now - self._last, packages))
+        self._last = now
+        self._modules = current
+
+    def report(self) -> str:
+        lines = [f"启动耗时报告 (共 {(self._last - self._start) * 1000:.1f} ms):"]
+        for phase, elapsed, packages in self.phases:
+            lines.append(f"  {phase:<16} {elapsed * 1000:8.1f} ms  新导入模块 {sum(packages.values())} 个")
+            for package, count in packages.most_common(5):
+                lines.append(f"      {package} ({count})")
+        loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+        lines.append(f"  已加载的重型模块: {', '.join(loaded) if loaded else '无'}")
+        return "\n".join(lines)
@@ -0,0 +1,17 @@
+import os
+from pathlib import Path
+
+WORKER_ENV = "TLV_WORKER_ID"
+
+
+def get_worker_id():
+    """当前进程的worker编号，单进程运行时返回None"""
+    return os.environ.get(WORKER_ENV)
+
+
+def output_dir(base) -> Path:
+    """按worker编号区分输出目录，单进程运行时保持原路径"""
+    worker_id = get_worker_id()
+    if worker_id is None:
+        return Path(base)
+    return Path(base) / f"worker-{worker_id}"